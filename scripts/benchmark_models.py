@@ -0,0 +1,165 @@
+import argparse
+import json
+import sys
+
+from uvcgan.bench import (
+    GEN_PRESETS, DISC_PRESETS, run_benchmarks, compare_to_baseline
+)
+from uvcgan.utils.log import setup_logging
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser(
+        description = 'Benchmark generators and discriminators'
+    )
+
+    parser.add_argument(
+        '--gen',
+        default = [ 'vit-unet', 'resnet_9blocks', 'unet_256' ],
+        choices = list(GEN_PRESETS),
+        dest    = 'gen',
+        help    = 'generator presets to benchmark',
+        nargs   = '*',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--disc',
+        default = [ 'basic' ],
+        choices = list(DISC_PRESETS),
+        dest    = 'disc',
+        help    = (
+            'discriminator presets to benchmark. The first one is also used'
+            ' in the optimization step benchmarks'
+        ),
+        nargs   = '*',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--shape',
+        default = [ 3, 256, 256 ],
+        dest    = 'shape',
+        help    = 'image shape (default = 3 256 256)',
+        nargs   = 3,
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--batch-size',
+        default = 1,
+        dest    = 'batch_size',
+        help    = 'batch size (default = 1)',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--device',
+        default = 'cpu',
+        dest    = 'device',
+        help    = 'device to run benchmarks on (default = cpu)',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--warmup',
+        default = 3,
+        dest    = 'warmup',
+        help    = 'number of warmup iterations (default = 3)',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--repeats',
+        default = 10,
+        dest    = 'repeats',
+        help    = 'number of timed iterations (default = 10)',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--no-step',
+        action  = 'store_false',
+        dest    = 'model_step',
+        help    = 'skip benchmarks of the full optimization step',
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        default = None,
+        dest    = 'output',
+        help    = 'save results to a JSON file',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--baseline',
+        default = None,
+        dest    = 'baseline',
+        help    = 'compare results against a baseline JSON file',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--tolerance',
+        default = 0.1,
+        dest    = 'tolerance',
+        help    = (
+            'relative median latency increase over the baseline that is'
+            ' reported as a regression (default = 0.1)'
+        ),
+        type    = float,
+    )
+
+    return parser.parse_args()
+
+def print_results(results):
+    print(
+        '%-40s %12s %12s %12s %12s' % (
+            'benchmark', 'p50 [ms]', 'p90 [ms]', 'img/s', 'mem [MiB]'
+        )
+    )
+
+    for (name, values) in results.items():
+        mem = values['max_mem_mb']
+        print(
+            '%-40s %12.2f %12.2f %12.2f %12s' % (
+                name, values['latency_p50_ms'], values['latency_p90_ms'],
+                values['images_per_sec'],
+                '-' if mem is None else '%.1f' % mem
+            )
+        )
+
+def main():
+    cmdargs = parse_cmdargs()
+    setup_logging('INFO')
+
+    results = run_benchmarks(
+        cmdargs.gen, cmdargs.disc, tuple(cmdargs.shape), cmdargs.batch_size,
+        cmdargs.device, cmdargs.warmup, cmdargs.repeats, cmdargs.model_step
+    )
+
+    print_results(results)
+
+    if cmdargs.output is not None:
+        with open(cmdargs.output, 'wt', encoding = 'utf-8') as f:
+            json.dump(results, f, indent = 4)
+
+    if cmdargs.baseline is None:
+        return
+
+    with open(cmdargs.baseline, 'rt', encoding = 'utf-8') as f:
+        baseline = json.load(f)
+
+    regressions = compare_to_baseline(results, baseline, cmdargs.tolerance)
+
+    for (name, base, value) in regressions:
+        print(
+            "Regression: '%s' median latency %.2f ms -> %.2f ms"
+            % (name, base, value)
+        )
+
+    if regressions:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
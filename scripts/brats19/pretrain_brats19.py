@@ -2,12 +2,16 @@ import argparse
 import os
 
 from uvcgan import ROOT_DATA, ROOT_OUTDIR, train
-from uvcgan.utils.parsers import add_preset_name_parser, add_batch_size_parser
+from uvcgan.utils.parsers import (
+    add_preset_name_parser, add_batch_size_parser, add_profile_parser,
+    get_profile_config
+)
 
 def parse_cmdargs():
     parser = argparse.ArgumentParser(description = 'Pretrain BRATS19 BERT')
     add_preset_name_parser(parser, 'gen', GEN_PRESETS, 'uvcgan', help_msg='generator type')
     add_batch_size_parser(parser, default = 64)
+    add_profile_parser(parser)
     return parser.parse_args()
 
 GEN_PRESETS = {
@@ -137,6 +141,7 @@ args_dict = {
     'outdir'     : os.path.join(ROOT_OUTDIR, 'brats19'),
     'log_level'  : 'DEBUG',
     'checkpoint' : 1,  # Save checkpoint every epoch
+    'profile'    : get_profile_config(cmdargs),
 }
 
 train(args_dict)
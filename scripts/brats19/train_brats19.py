@@ -2,7 +2,9 @@ import argparse
 import os
 
 from uvcgan import ROOT_OUTDIR, train
-from uvcgan.utils.parsers import add_preset_name_parser
+from uvcgan.utils.parsers import (
+    add_preset_name_parser, add_profile_parser, get_profile_config
+)
 
 def parse_cmdargs():
     parser = argparse.ArgumentParser(
@@ -50,6 +52,8 @@ def parse_cmdargs():
                         action = 'store_true',
                         help = 'Skip pretrained model transfer (train from scratch)')
 
+    add_profile_parser(parser)
+
     return parser.parse_args()
 
 GEN_PRESETS = {
@@ -201,6 +205,7 @@ args_dict = {
     'outdir' : os.path.join(ROOT_OUTDIR, 'brats19'),
     'log_level'  : 'DEBUG',
     'checkpoint' : 1,  # Save checkpoint every epoch
+    'profile'    : get_profile_config(cmdargs),
 }
 
 train(args_dict)
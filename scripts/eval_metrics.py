@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+import argparse
+import json
+import os
+
+import tqdm
+
+from uvcgan.consts import MERGE_PAIRED
+from uvcgan.eval.funcs import (
+    load_eval_model_dset_from_cmdargs, slice_data_loader
+)
+from uvcgan.eval.metrics import (
+    evaluate_metrics, format_metrics_summary,
+    TRANSLATION_PAIRS, RECONSTRUCTION_PAIRS
+)
+from uvcgan.utils.parsers import add_standard_eval_parsers
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser(
+        description = (
+            'Compute MAE, PSNR and SSIM of translations against paired'
+            ' targets'
+        )
+    )
+    add_standard_eval_parsers(parser)
+
+    parser.add_argument(
+        '--reco',
+        action  = 'store_true',
+        dest    = 'reco',
+        help    = 'also evaluate cycle reconstructions',
+    )
+
+    parser.add_argument(
+        '--data-range',
+        default = 1.0,
+        dest    = 'data_range',
+        help    = 'range of image values for PSNR and SSIM (default = 1)',
+        type    = float,
+    )
+
+    return parser.parse_args()
+
+def get_summary_path(evaldir, model_state, split):
+    return os.path.join(evaldir, f'metrics_{model_state}-{split}.json')
+
+def main():
+    cmdargs = parse_cmdargs()
+
+    pairs = dict(TRANSLATION_PAIRS)
+    if cmdargs.reco:
+        pairs.update(RECONSTRUCTION_PAIRS)
+
+    args, model, data_it, evaldir = load_eval_model_dset_from_cmdargs(
+        cmdargs, merge_type = MERGE_PAIRED
+    )
+
+    data_it, steps = slice_data_loader(
+        data_it, args.batch_size, cmdargs.n_eval
+    )
+
+    summary = evaluate_metrics(
+        model, tqdm.tqdm(data_it, desc = 'Evaluating', total = steps),
+        pairs, data_range = cmdargs.data_range
+    )
+
+    path = get_summary_path(evaldir, cmdargs.model_state, cmdargs.split)
+
+    with open(path, 'wt', encoding = 'utf-8') as f:
+        json.dump(summary, f, indent = 4)
+
+    print(format_metrics_summary(summary))
+    print("Metrics saved to '%s'" % path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+import argparse
+import sys
+
+from uvcgan.eval.export import export_generator
+from uvcgan.utils.parsers import (
+    add_model_directory_parser, add_eval_epoch_parser,
+    add_model_state_parser, add_batch_size_parser
+)
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser(
+        description = 'Export a generator as a standalone TorchScript graph'
+    )
+    add_model_directory_parser(parser)
+    add_eval_epoch_parser(parser)
+    add_model_state_parser(parser)
+    add_batch_size_parser(parser)
+
+    parser.add_argument(
+        '--network',
+        default = 'gen_ab',
+        dest    = 'network',
+        help    = 'name of the network to export (default = gen_ab)',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--dynamic-batch',
+        action  = 'store_true',
+        dest    = 'dynamic_batch',
+        help    = 'export graph that accepts batches of any size',
+    )
+
+    parser.add_argument(
+        '--device',
+        default = 'cpu',
+        dest    = 'device',
+        help    = 'device to trace the network on (default = cpu)',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        default = None,
+        dest    = 'output',
+        help    = 'path of the exported graph (default = EVALDIR/exported)',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--atol',
+        default = 1e-4,
+        dest    = 'atol',
+        help    = (
+            'max absolute difference between the exported and the eager'
+            ' outputs (default = 1e-4)'
+        ),
+        type    = float,
+    )
+
+    return parser.parse_args()
+
+def main():
+    cmdargs = parse_cmdargs()
+
+    savepath, parity = export_generator(
+        cmdargs.model, cmdargs.epoch, cmdargs.network,
+        savepath      = cmdargs.output,
+        batch_size    = cmdargs.batch_size,
+        dynamic_batch = cmdargs.dynamic_batch,
+        model_state   = cmdargs.model_state,
+        device        = cmdargs.device,
+    )
+
+    print("Exported '%s' to '%s'" % (cmdargs.network, savepath))
+    success = True
+
+    for (batch_size, error) in parity.items():
+        print('Parity at batch size %d: max abs error = %.4e' % (
+            batch_size, error
+        ))
+
+        if error > cmdargs.atol:
+            success = False
+
+    if not success:
+        print('Parity check failed: error exceeds %.4e' % cmdargs.atol)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""Translate images with a graph saved by `export_model.py`.
+
+This script depends on torch and numpy only and does not import uvcgan.
+Inputs are preprocessed numpy arrays of shape (H, W, C) or (H, W), e.g.
+produced by `translate_data.py`. Outputs are saved in the same layout.
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import torch
+
+EXPORT_METADATA = 'uvcgan_metadata.json'
+EXTENSIONS      = ( '.npy', '.npz' )
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser(
+        description = 'Run exported TorchScript generator'
+    )
+
+    parser.add_argument('graph', help = 'exported graph', type = str)
+
+    parser.add_argument(
+        'inputs',
+        help  = 'input .npy/.npz files or directories with them',
+        nargs = '+',
+        type  = str,
+    )
+
+    parser.add_argument(
+        '-o', '--outdir',
+        dest     = 'outdir',
+        help     = 'directory to save translated images to',
+        required = True,
+        type     = str,
+    )
+
+    parser.add_argument(
+        '--batch-size',
+        default = None,
+        dest    = 'batch_size',
+        help    = (
+            'batch size. Defaults to the batch size of the graph, or 1 for'
+            ' graphs with dynamic batch size'
+        ),
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--device',
+        default = 'cpu',
+        dest    = 'device',
+        help    = 'device to run the graph on (default = cpu)',
+        type    = str,
+    )
+
+    return parser.parse_args()
+
+def load_graph(path, device):
+    extra_files = { EXPORT_METADATA : '' }
+    graph = torch.jit.load(
+        path, map_location = device, _extra_files = extra_files
+    )
+
+    return (graph, json.loads(extra_files[EXPORT_METADATA]))
+
+def collect_inputs(paths):
+    result = []
+
+    for path in paths:
+        if os.path.isdir(path):
+            result += sorted(
+                os.path.join(path, fname) for fname in os.listdir(path)
+                    if fname.endswith(EXTENSIONS)
+            )
+        else:
+            result.append(path)
+
+    return result
+
+def load_array(path):
+    if path.endswith('.npz'):
+        with np.load(path) as f:
+            image = f[f.files[0]]
+    else:
+        image = np.load(path)
+
+    # image : (H, W, C) or (H, W)
+    if image.ndim == 2:
+        image = image[..., np.newaxis]
+
+    # result : (C, H, W)
+    return image.transpose((2, 0, 1)).astype(np.float32)
+
+def save_array(path, image):
+    # image : (C, H, W)
+    np.save(path, np.squeeze(image.transpose((1, 2, 0))))
+
+def translate_batch(graph, images, batch_size, device):
+    n = len(images)
+    x = torch.from_numpy(np.stack(images))
+
+    if batch_size is not None and n < batch_size:
+        # NOTE: graphs with fixed batch size require full batches
+        pad = x[-1:].expand(batch_size - n, *x.shape[1:])
+        x   = torch.cat([ x, pad ], dim = 0)
+
+    with torch.no_grad():
+        y = graph(x.to(device))
+
+    return y[:n].cpu().numpy()
+
+def main():
+    cmdargs = parse_cmdargs()
+
+    start = time.perf_counter()
+    graph, metadata = load_graph(cmdargs.graph, cmdargs.device)
+    print('Loaded %s in %.1f ms' % (
+        metadata.get('network'), 1000 * (time.perf_counter() - start)
+    ))
+
+    fixed_batch = metadata.get('batch_size')
+    batch_size  = cmdargs.batch_size or fixed_batch or 1
+
+    if (fixed_batch is not None) and (batch_size != fixed_batch):
+        raise ValueError(
+            'Graph was exported with fixed batch size %d' % fixed_batch
+        )
+
+    paths = collect_inputs(cmdargs.inputs)
+    os.makedirs(cmdargs.outdir, exist_ok = True)
+
+    for index in range(0, len(paths), batch_size):
+        batch_paths = paths[index:index + batch_size]
+        images      = [ load_array(path) for path in batch_paths ]
+        result      = translate_batch(
+            graph, images, fixed_batch, cmdargs.device
+        )
+
+        for (path, image) in zip(batch_paths, result):
+            name = os.path.splitext(os.path.basename(path))[0]
+            save_array(os.path.join(cmdargs.outdir, name + '.npy'), image)
+
+    print('Translated %d images' % len(paths))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+import argparse
+import logging
+
+from uvcgan.consts import MERGE_NONE
+from uvcgan.eval.funcs import start_model_eval
+from uvcgan.eval.server import InferenceService, construct_server
+from uvcgan.utils.log import setup_logging
+from uvcgan.utils.parsers import (
+    add_model_directory_parser, add_eval_epoch_parser, add_model_state_parser
+)
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser(
+        description = 'Serve model generators over HTTP'
+    )
+    add_model_directory_parser(parser)
+    add_eval_epoch_parser(parser)
+    add_model_state_parser(parser)
+
+    parser.add_argument(
+        '--networks',
+        default = [ 'gen_ab' ],
+        dest    = 'networks',
+        help    = 'networks to serve (default = gen_ab)',
+        nargs   = '+',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--host',
+        default = 'localhost',
+        dest    = 'host',
+        help    = 'address to listen on (default = localhost)',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--port',
+        default = 8000,
+        dest    = 'port',
+        help    = 'port to listen on (default = 8000)',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--unix',
+        default = None,
+        dest    = 'unix',
+        help    = 'listen on unix socket at this path instead of a port',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--max-batch-size',
+        default = 8,
+        dest    = 'max_batch_size',
+        help    = 'max number of requests in a batch (default = 8)',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--max-latency-ms',
+        default = 10,
+        dest    = 'max_latency_ms',
+        help    = (
+            'max time a request waits for other requests to be batched'
+            ' with (default = 10)'
+        ),
+        type    = float,
+    )
+
+    parser.add_argument(
+        '--max-queue',
+        default = 256,
+        dest    = 'max_queue',
+        help    = (
+            'max number of queued requests per network. Requests beyond'
+            ' that are rejected with 503 (default = 256)'
+        ),
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--timeout',
+        default = None,
+        dest    = 'timeout',
+        help    = (
+            'request timeout in seconds. Requests that are not translated'
+            ' in time are dropped and answered with 504 (default = None)'
+        ),
+        type    = float,
+    )
+
+    return parser.parse_args()
+
+def main():
+    setup_logging(logging.INFO)
+    cmdargs = parse_cmdargs()
+
+    _args, model, _evaldir = start_model_eval(
+        cmdargs.model, cmdargs.epoch, cmdargs.model_state,
+        merge_type = MERGE_NONE, models = cmdargs.networks
+    )
+
+    service = InferenceService(
+        model, cmdargs.networks,
+        max_batch_size = cmdargs.max_batch_size,
+        max_latency_ms = cmdargs.max_latency_ms,
+        max_queue      = cmdargs.max_queue,
+    )
+
+    server = construct_server(
+        service, cmdargs.host, cmdargs.port, cmdargs.unix, cmdargs.timeout
+    )
+
+    print('Serving %s on %s' % (
+        service.networks, cmdargs.unix or f'{cmdargs.host}:{cmdargs.port}'
+    ))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,9 @@ import argparse
 import os
 
 from uvcgan import ROOT_OUTDIR, train
-from uvcgan.utils.parsers import add_preset_name_parser
+from uvcgan.utils.parsers import (
+    add_preset_name_parser, add_profile_parser, get_profile_config
+)
 
 def parse_cmdargs():
     parser = argparse.ArgumentParser(
@@ -45,6 +47,8 @@ def parse_cmdargs():
                                 'See the UVCGAN paper (https://arxiv.org/pdf/2203.02557.pdf) '
                                 'section 3.3 for more detail.'))
 
+    add_profile_parser(parser)
+
     return parser.parse_args()
 
 GEN_PRESETS = {
@@ -171,6 +175,7 @@ args_dict = {
     'outdir' : os.path.join(ROOT_OUTDIR, 'slats'),
     'log_level'  : 'DEBUG',
     'checkpoint' : 50,
+    'profile'    : get_profile_config(cmdargs),
 }
 
 train(args_dict)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+import argparse
+import logging
+import os
+
+import torch
+
+from uvcgan.consts import MERGE_NONE
+from uvcgan.data import construct_data_loaders
+from uvcgan.eval.funcs import start_model_eval
+from uvcgan.eval.metrics import TRANSLATION_PAIRS, RECONSTRUCTION_PAIRS
+from uvcgan.eval.sweep import (
+    parse_epochs, cache_batches, sweep_epochs, get_sweep_savedir_fn,
+    get_sweep_metrics_path, SweepMetricsWriter
+)
+from uvcgan.eval.writer import CODECS, CODEC_NPZ
+from uvcgan.utils.log import setup_logging
+from uvcgan.utils.parsers import (
+    add_model_directory_parser, add_model_state_parser, add_split_parser,
+    add_batch_size_parser, add_n_eval_samples_parser
+)
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser(
+        description = 'Evaluate multiple checkpoints on the same data'
+    )
+    add_model_directory_parser(parser)
+    add_model_state_parser(parser)
+    add_split_parser(parser)
+    add_batch_size_parser(parser)
+    add_n_eval_samples_parser(parser)
+
+    parser.add_argument(
+        '--epochs',
+        default = [ 'all' ],
+        dest    = 'epochs',
+        help    = (
+            "epochs to evaluate: numbers, 'START:END[:STEP]' ranges,"
+            " 'final' or 'all' (default = all)"
+        ),
+        nargs   = '+',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--outputs',
+        default = [ 'fake_b', 'fake_a' ],
+        dest    = 'outputs',
+        help    = 'images to save for each epoch (default = fake_b fake_a)',
+        nargs   = '*',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--paired',
+        action  = 'store_true',
+        dest    = 'paired',
+        help    = (
+            'compare translations to the samples of the other domain with'
+            ' the same index'
+        ),
+    )
+
+    parser.add_argument(
+        '--data-range',
+        default = 1.0,
+        dest    = 'data_range',
+        help    = 'range of image values for PSNR and SSIM (default = 1)',
+        type    = float,
+    )
+
+    parser.add_argument(
+        '--no-save',
+        action  = 'store_false',
+        dest    = 'save',
+        help    = 'compute metrics only, without saving images',
+    )
+
+    parser.add_argument(
+        '--codec',
+        choices = CODECS,
+        default = CODEC_NPZ,
+        dest    = 'codec',
+        help    = f'output format (default = {CODEC_NPZ})',
+        type    = str,
+    )
+
+    return parser.parse_args()
+
+def main():
+    setup_logging(logging.INFO)
+    cmdargs = parse_cmdargs()
+
+    epochs = parse_epochs(cmdargs.model, cmdargs.epochs)
+    if not epochs:
+        raise RuntimeError("No checkpoints found in '%s'" % cmdargs.model)
+
+    # NOTE: no networks are loaded here. `sweep_epochs` loads only the
+    #       networks needed for the outputs, once per epoch.
+    args, model, _evaldir = start_model_eval(
+        cmdargs.model, epochs[0], cmdargs.model_state,
+        merge_type = MERGE_NONE, models = [], mkdir = False,
+        batch_size = cmdargs.batch_size
+    )
+
+    data_list = construct_data_loaders(
+        args.config.data, args.config.batch_size, split = cmdargs.split
+    )
+
+    if not isinstance(data_list, (list, tuple)):
+        data_list = [ data_list, ]
+
+    n_batches = None
+    if cmdargs.n_eval is not None:
+        n_batches = -(-cmdargs.n_eval // cmdargs.batch_size)
+
+    cached = cache_batches(
+        data_list, n_batches,
+        pin_memory = (torch.device(model.device).type == 'cuda')
+    )
+    del data_list
+
+    pairs = dict(RECONSTRUCTION_PAIRS)
+    if cmdargs.paired:
+        pairs.update(TRANSLATION_PAIRS)
+
+    savedir_fn = None
+
+    if cmdargs.save:
+        savedir_fn = get_sweep_savedir_fn(
+            cmdargs.model, cmdargs.model_state, cmdargs.split
+        )
+
+    path = get_sweep_metrics_path(
+        cmdargs.model, cmdargs.model_state, cmdargs.split
+    )
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+
+    with SweepMetricsWriter(path) as metrics_writer:
+        records = sweep_epochs(
+            model, epochs, cached, cmdargs.outputs, pairs,
+            cmdargs.model_state,
+            savedir_fn     = savedir_fn,
+            codec          = cmdargs.codec,
+            writers        = min(os.cpu_count() or 1, 8),
+            metrics_writer = metrics_writer,
+            data_range     = cmdargs.data_range,
+        )
+
+    for record in records:
+        print(', '.join(
+            f'{k} = {v:.4e}' if isinstance(v, float) else f'{k} = {v}'
+                for (k, v) in record.items()
+        ))
+
+    print("Metrics saved to '%s'" % path)
+
+if __name__ == '__main__':
+    main()
@@ -5,73 +5,202 @@ import collections
 import os
 
 import tqdm
-import numpy as np
 
 from uvcgan.consts import MERGE_NONE
 from uvcgan.eval.funcs import (
-    load_eval_model_dset_from_cmdargs, tensor_to_image, slice_data_loader,
-    get_eval_savedir, make_image_subdirs
+    load_eval_model_dset_from_cmdargs, slice_data_loader,
+    get_eval_savedir, make_image_subdirs, apply_tiled_inference
 )
-from uvcgan.utils.parsers import add_standard_eval_parsers
+from uvcgan.torch.tiled_inference import WINDOWS, WINDOW_HANN
+from uvcgan.eval.writer import AsyncImageWriter, CODECS, CODEC_NPZ
+from uvcgan.eval.quantization import (
+    quantize_model, print_quantization_report, QUANTIZE_MODES
+)
+from uvcgan.utils.parsers import add_standard_eval_parsers, add_outputs_parser
 
 def parse_cmdargs():
     parser = argparse.ArgumentParser(
         description = 'Save model predictions as numpy arrays'
     )
     add_standard_eval_parsers(parser)
+    add_outputs_parser(parser)
+
+    parser.add_argument(
+        '--codec',
+        choices = CODECS,
+        default = CODEC_NPZ,
+        dest    = 'codec',
+        help    = f'output format (default = {CODEC_NPZ})',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--writers',
+        default = min(os.cpu_count() or 1, 8),
+        dest    = 'writers',
+        help    = 'number of background writer threads',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--tiled',
+        action  = 'store_true',
+        dest    = 'tiled',
+        help    = (
+            'translate images of arbitrary size with a sliding window.'
+            ' Note that the data transformations of the model config are'
+            ' still applied to the inputs'
+        ),
+    )
+
+    parser.add_argument(
+        '--tile-size',
+        default = None,
+        dest    = 'tile_size',
+        help    = 'tile size (default = image shape of the model config)',
+        nargs   = 2,
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--tile-overlap',
+        default = 32,
+        dest    = 'tile_overlap',
+        help    = 'overlap between neighboring tiles (default = 32)',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--tile-window',
+        choices = WINDOWS,
+        default = WINDOW_HANN,
+        dest    = 'tile_window',
+        help    = f'tile blending window (default = {WINDOW_HANN})',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--tile-batch-size',
+        default = 16,
+        dest    = 'tile_batch_size',
+        help    = 'number of tiles to process at once (default = 16)',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--quantize',
+        choices = QUANTIZE_MODES,
+        default = None,
+        dest    = 'quantize',
+        help    = (
+            'run int8 quantized inference on the CPU. "dynamic" quantizes'
+            ' the transformer linear layers, "static" additionally'
+            ' quantizes the UNet conv blocks'
+        ),
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--calibration-steps',
+        default = 4,
+        dest    = 'calibration_steps',
+        help    = 'number of batches per domain for static calibration',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--report-steps',
+        default = 4,
+        dest    = 'report_steps',
+        help    = (
+            'number of batches per domain to compare quantized outputs'
+            ' against the fp32 ones'
+        ),
+        type    = int,
+    )
 
     return parser.parse_args()
 
-def save_data(model, savedir, sample_counter):
-    for (name, torch_image) in model.images.items():
+def save_data(images, writer, sample_counter):
+    for (name, torch_image) in images.items():
         if torch_image is None:
             continue
 
-        for index in range(torch_image.shape[0]):
-            sample_index = sample_counter[name]
-
-            image = tensor_to_image(torch_image[index])
-            path  = os.path.join(savedir, name, f'sample_{sample_index}.npz')
-
-            sample_counter[name] += 1
-            np.savez_compressed(path, np.squeeze(image))
+        writer.write(name, torch_image, sample_counter[name])
+        sample_counter[name] += torch_image.shape[0]
 
 def dump_single_domain_images(
-    model, data_it, domain, n_eval, batch_size, savedir, sample_counter
+    model, data_it, domain, n_eval, batch_size, writer, sample_counter,
+    outputs
 ):
     # pylint: disable=too-many-arguments
     data_it, steps = slice_data_loader(data_it, batch_size, n_eval)
 
     for batch in tqdm.tqdm(data_it, desc = f'Translating {domain}', total = steps):
         model.set_input(batch, domain = domain)
-        model.forward_nograd()
 
-        save_data(model, savedir, sample_counter)
+        if outputs is None:
+            model.forward_nograd()
+            images = model.images
+        else:
+            images = model.infer(outputs)
+
+        save_data(images, writer, sample_counter)
 
-def dump_images(model, data_list, n_eval, batch_size, savedir):
-    make_image_subdirs(model, savedir)
+def dump_images(
+    model, data_list, n_eval, batch_size, savedir, codec, writers,
+    outputs = None
+):
+    # pylint: disable=too-many-arguments
+    make_image_subdirs(model, savedir, outputs)
     sample_counter = collections.defaultdict(int)
 
-    for domain, data_it in enumerate(data_list):
-        dump_single_domain_images(
-            model, data_it, domain, n_eval, batch_size, savedir, sample_counter
-        )
+    with AsyncImageWriter(savedir, codec, writers) as writer:
+        for domain, data_it in enumerate(data_list):
+            dump_single_domain_images(
+                model, data_it, domain, n_eval, batch_size, writer,
+                sample_counter, outputs
+            )
 
 def main():
     cmdargs = parse_cmdargs()
 
     args, model, data_list, evaldir = load_eval_model_dset_from_cmdargs(
-        cmdargs, merge_type = MERGE_NONE
+        cmdargs, merge_type = MERGE_NONE, outputs = cmdargs.outputs,
+        device = ('cpu' if cmdargs.quantize else None)
     )
 
     if not isinstance(data_list, (list, tuple)):
         data_list = [ data_list, ]
 
+    if cmdargs.quantize:
+        report = quantize_model(
+            model, data_list, cmdargs.outputs, cmdargs.quantize,
+            calibration_steps = cmdargs.calibration_steps,
+            report_steps      = cmdargs.report_steps,
+        )
+        print_quantization_report(report)
+
+    if cmdargs.tiled:
+        tile_size = (
+            cmdargs.tile_size or args.config.data.datasets[0].shape[1:]
+        )
+
+        apply_tiled_inference(
+            model, tile_size,
+            overlap    = cmdargs.tile_overlap,
+            window     = cmdargs.tile_window,
+            batch_size = cmdargs.tile_batch_size,
+        )
+
     savedir = get_eval_savedir(
         evaldir, 'ndarrays', cmdargs.model_state, cmdargs.split
     )
 
-    dump_images(model, data_list, cmdargs.n_eval, args.batch_size, savedir)
+    dump_images(
+        model, data_list, cmdargs.n_eval, args.batch_size, savedir,
+        cmdargs.codec, cmdargs.writers, cmdargs.outputs
+    )
 
 if __name__ == '__main__':
     main()
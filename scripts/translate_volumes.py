@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+
+import argparse
+import os
+
+import tqdm
+
+from uvcgan.consts import MERGE_NONE
+from uvcgan.eval.export import get_network_input_domain
+from uvcgan.eval.funcs import start_model_eval
+from uvcgan.eval.volumes import find_volumes, translate_volumes
+from uvcgan.utils.parsers import (
+    add_model_directory_parser, add_eval_epoch_parser,
+    add_model_state_parser, add_batch_size_parser
+)
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser(
+        description = 'Translate 3D volumes (e.g. MRI scans) slice by slice'
+    )
+    add_model_directory_parser(parser)
+    add_eval_epoch_parser(parser)
+    add_model_state_parser(parser)
+    add_batch_size_parser(parser, default = 16)
+
+    parser.add_argument(
+        'inputs',
+        help    = (
+            'volumes (.npy, .npz, .nii, .nii.gz) or directories with them'
+        ),
+        metavar = 'INPUT',
+        nargs   = '+',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--network',
+        default = 'gen_ab',
+        dest    = 'network',
+        help    = 'network to translate volumes with (default = gen_ab)',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--slice-axis',
+        default = 0,
+        dest    = 'slice_axis',
+        help    = 'volume axis to slice along (default = 0)',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--scale',
+        default = 1,
+        dest    = 'scale',
+        help    = (
+            'slices are normalized as x / scale + shift before the'
+            ' translation, and the outputs are converted back (default = 1)'
+        ),
+        type    = float,
+    )
+
+    parser.add_argument(
+        '--shift',
+        default = 0,
+        dest    = 'shift',
+        help    = 'see --scale (default = 0)',
+        type    = float,
+    )
+
+    parser.add_argument(
+        '--resize',
+        action  = 'store_true',
+        dest    = 'resize',
+        help    = (
+            'resize slices to the image shape of the model and the outputs'
+            ' back to the slice shape'
+        ),
+    )
+
+    parser.add_argument(
+        '-o', '--outdir',
+        default = None,
+        dest    = 'outdir',
+        help    = 'output directory (default = EVALDIR/volumes_NETWORK)',
+        type    = str,
+    )
+
+    return parser.parse_args()
+
+def main():
+    cmdargs = parse_cmdargs()
+
+    args, model, evaldir = start_model_eval(
+        cmdargs.model, cmdargs.epoch, cmdargs.model_state,
+        merge_type = MERGE_NONE, models = [ cmdargs.network ]
+    )
+
+    paths  = find_volumes(cmdargs.inputs)
+    outdir = cmdargs.outdir or os.path.join(
+        evaldir, f'volumes_{cmdargs.network}'
+    )
+
+    shape = None
+    if cmdargs.resize:
+        domain = get_network_input_domain(model, cmdargs.network)
+        shape  = args.config.data.datasets[domain].shape[1:]
+
+    translate_volumes(
+        model.models[cmdargs.network], paths, outdir,
+        axis       = cmdargs.slice_axis,
+        batch_size = cmdargs.batch_size,
+        device     = model.device,
+        shape      = shape,
+        scale      = cmdargs.scale,
+        shift      = cmdargs.shift,
+        progress   = lambda x : tqdm.tqdm(x, desc = 'Translating volumes'),
+    )
+
+    print("Translated %d volumes to '%s'" % (len(paths), outdir))
+
+if __name__ == '__main__':
+    main()
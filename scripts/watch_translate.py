@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+
+import argparse
+import logging
+import os
+
+from uvcgan.consts import MERGE_NONE
+from uvcgan.eval.funcs import start_model_eval
+from uvcgan.eval.watcher import construct_streaming_translator
+from uvcgan.eval.writer import CODECS, CODEC_NPZ
+from uvcgan.utils.log import setup_logging
+from uvcgan.utils.parsers import (
+    add_model_directory_parser, add_eval_epoch_parser,
+    add_model_state_parser, add_batch_size_parser
+)
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser(
+        description = 'Translate files as they arrive in a directory'
+    )
+    add_model_directory_parser(parser)
+    add_eval_epoch_parser(parser)
+    add_model_state_parser(parser)
+    add_batch_size_parser(parser, default = 16)
+
+    parser.add_argument(
+        'indir',
+        help    = 'directory to watch for new images or .npz arrays',
+        metavar = 'INDIR',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--network',
+        default = 'gen_ab',
+        dest    = 'network',
+        help    = 'network to translate files with (default = gen_ab)',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '-o', '--outdir',
+        default = None,
+        dest    = 'outdir',
+        help    = 'output directory (default = EVALDIR/stream_NETWORK)',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--codec',
+        choices = CODECS,
+        default = CODEC_NPZ,
+        dest    = 'codec',
+        help    = f'output format (default = {CODEC_NPZ})',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--max-latency',
+        default = 1.0,
+        dest    = 'max_latency',
+        help    = (
+            'max time in seconds a new file waits for a batch to fill up'
+            ' (default = 1)'
+        ),
+        type    = float,
+    )
+
+    parser.add_argument(
+        '--settle',
+        default = 1.0,
+        dest    = 'settle',
+        help    = (
+            'time in seconds a file must stay unchanged before it is'
+            ' translated (default = 1)'
+        ),
+        type    = float,
+    )
+
+    parser.add_argument(
+        '--poll-interval',
+        default = 0.5,
+        dest    = 'poll_interval',
+        help    = 'directory polling interval in seconds (default = 0.5)',
+        type    = float,
+    )
+
+    parser.add_argument(
+        '--once',
+        action  = 'store_true',
+        dest    = 'once',
+        help    = 'translate files present in the directory and exit',
+    )
+
+    return parser.parse_args()
+
+def main():
+    setup_logging(logging.INFO)
+    cmdargs = parse_cmdargs()
+
+    args, model, evaldir = start_model_eval(
+        cmdargs.model, cmdargs.epoch, cmdargs.model_state,
+        merge_type = MERGE_NONE, models = [ cmdargs.network ]
+    )
+
+    outdir = cmdargs.outdir or os.path.join(
+        evaldir, f'stream_{cmdargs.network}'
+    )
+
+    translator = construct_streaming_translator(
+        model, args.config, cmdargs.network, cmdargs.indir, outdir,
+        batch_size      = cmdargs.batch_size,
+        max_latency_sec = cmdargs.max_latency,
+        settle_sec      = cmdargs.settle,
+        codec           = cmdargs.codec,
+    )
+
+    print("Watching '%s'. Saving translations to '%s'" % (
+        cmdargs.indir, outdir
+    ))
+
+    try:
+        translator.run(cmdargs.poll_interval, once = cmdargs.once)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -15,5 +15,10 @@ setuptools.setup(
         include = [ 'uvcgan', 'uvcgan.*' ]
     ),
     install_requires = [ 'numpy', 'pandas', 'tqdm', 'Pillow' ],
+    entry_points     = {
+        'console_scripts' : [
+            'benchmark-data = uvcgan.bench.data:main',
+        ],
+    },
 )
 
@@ -86,6 +86,55 @@ class GANLoss(nn.Module):
         target_tensor = self.get_target_tensor(prediction, target_is_real)
         return self.loss(prediction, target_tensor)
 
+# pylint: disable=redefined-builtin
+def get_gradient_penalty_inputs(real_data, fake_data, device, type = 'mixed'):
+    """Construct inputs to evaluate the gradient penalty at.
+
+    Arguments:
+        real_data (tensor array)    -- real images
+        fake_data (tensor array)    -- generated images from the generator
+        device (str)                -- torch device
+        type (str)                  -- if we mix real and fake data or not
+            Choices: [real | fake | mixed].
+
+    Returns the (detached) gradient penalty inputs
+    """
+    if type == 'real':
+        return real_data
+
+    if type == 'fake':
+        return fake_data
+
+    if type == 'mixed':
+        alpha = torch.rand(real_data.shape[0], 1, device = device)
+        alpha = alpha.expand(
+            real_data.shape[0], real_data.nelement() // real_data.shape[0]
+        ).contiguous().view(*real_data.shape)
+
+        return alpha * real_data + ((1 - alpha) * fake_data)
+
+    raise NotImplementedError('{} not implemented'.format(type))
+
+def calc_gradient_penalty_from_gradients(
+    gradients, constant = 1.0, lambda_gp = 10.0
+):
+    """Calculate the gradient penalty loss from the discriminator gradients
+
+    Arguments:
+        gradients (tensor array)    -- gradients of the discriminator output
+            with respect to its inputs
+        constant (float)            -- the constant used in formula:
+            (||gradient||_2 - constant)^2
+        lambda_gp (float)           -- weight for this loss
+
+    Returns the gradient penalty loss
+    """
+    gradients = gradients.view(gradients.size(0), -1)
+
+    return (
+        ((gradients + 1e-16).norm(2, dim=1) - constant) ** 2
+    ).mean() * lambda_gp
+
 # pylint: disable=too-many-arguments
 # pylint: disable=redefined-builtin
 def cal_gradient_penalty(
@@ -112,19 +161,9 @@ def cal_gradient_penalty(
     if lambda_gp == 0.0:
         return 0.0, None
 
-    if type == 'real':
-        interpolatesv = real_data
-    elif type == 'fake':
-        interpolatesv = fake_data
-    elif type == 'mixed':
-        alpha = torch.rand(real_data.shape[0], 1, device = device)
-        alpha = alpha.expand(
-            real_data.shape[0], real_data.nelement() // real_data.shape[0]
-        ).contiguous().view(*real_data.shape)
-
-        interpolatesv = alpha * real_data + ((1 - alpha) * fake_data)
-    else:
-        raise NotImplementedError('{} not implemented'.format(type))
+    interpolatesv = get_gradient_penalty_inputs(
+        real_data, fake_data, device, type
+    )
 
     interpolatesv.requires_grad_(True)
     disc_interpolates = netD(interpolatesv)
@@ -137,9 +176,8 @@ def cal_gradient_penalty(
 
     gradients = gradients[0].view(real_data.size(0), -1)
 
-    gradient_penalty = (
-        ((gradients + 1e-16).norm(2, dim=1) - constant) ** 2
-    ).mean() * lambda_gp
+    gradient_penalty = calc_gradient_penalty_from_gradients(
+        gradients, constant, lambda_gp
+    )
 
     return gradient_penalty, gradients
-
@@ -0,0 +1,4 @@
+from .presets import GEN_PRESETS, DISC_PRESETS
+from .suite   import (
+    bench_network, bench_model_step, run_benchmarks, compare_to_baseline
+)
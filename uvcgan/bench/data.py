@@ -0,0 +1,258 @@
+import argparse
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+from uvcgan.config import Config
+from uvcgan.consts import SPLIT_TRAIN, SPLIT_TEST, SPLIT_VAL
+from uvcgan.data   import construct_data_loaders
+
+from uvcgan.train.metrics import get_max_rss_mb
+
+TIMING_KEY = '__stage_timing'
+
+class StageTimedDataset(Dataset):
+    """Dataset wrapper that measures the time of the pipeline stages.
+
+    If the wrapped dataset applies its transformation through a
+    `_transform` attribute (as all of the `uvcgan` datasets do), then the
+    transformation is applied by the wrapper, and the sample loading and
+    decoding time ('load') is measured separately from the transformation
+    time ('transform'). Otherwise, the total time is reported as 'load'.
+
+    Each sample is returned as `{ 'sample' : x, TIMING_KEY : timing }`, where
+    `timing` holds the worker id and the stage times.
+    """
+
+    def __init__(self, dataset):
+        super().__init__()
+
+        self._dataset   = dataset
+        self._transform = getattr(dataset, '_transform', None)
+
+        if self._transform is not None:
+            dataset._transform = None
+
+    def __len__(self):
+        return len(self._dataset)
+
+    def __getitem__(self, index):
+        start  = time.perf_counter()
+        sample = self._dataset[index]
+        loaded = time.perf_counter()
+
+        if self._transform is not None:
+            sample = self._transform(sample)
+
+        end    = time.perf_counter()
+        worker = torch.utils.data.get_worker_info()
+
+        timing = torch.tensor([
+            -1 if worker is None else worker.id,
+            loaded - start,
+            end - loaded,
+        ], dtype = torch.float64)
+
+        return { 'sample' : sample, TIMING_KEY : timing }
+
+def collect_timings(batch, result):
+    if isinstance(batch, dict):
+        if TIMING_KEY in batch:
+            result.append(batch[TIMING_KEY].reshape(-1, 3))
+            return
+
+        for value in batch.values():
+            collect_timings(value, result)
+
+    elif isinstance(batch, (list, tuple)):
+        for value in batch:
+            collect_timings(value, result)
+
+def count_samples(batch):
+    if isinstance(batch, dict) and (TIMING_KEY in batch):
+        return batch[TIMING_KEY].reshape(-1, 3).shape[0]
+
+    if isinstance(batch, (list, tuple)):
+        return count_samples(batch[0])
+
+    if isinstance(batch, dict):
+        return count_samples(next(iter(batch.values())))
+
+    return 0
+
+def summarize_timings(timings):
+    timings = torch.cat(timings).numpy()
+    result  = {}
+
+    for worker in np.unique(timings[:, 0]):
+        mask = (timings[:, 0] == worker)
+        result['worker_%d' % int(worker)] = {
+            'samples'      : int(mask.sum()),
+            'load_ms'      : 1000 * float(timings[mask, 1].mean()),
+            'transform_ms' : 1000 * float(timings[mask, 2].mean()),
+        }
+
+    result['all'] = {
+        'samples'      : len(timings),
+        'load_ms'      : 1000 * float(timings[:, 1].mean()),
+        'transform_ms' : 1000 * float(timings[:, 2].mean()),
+    }
+
+    return result
+
+def bench_data(
+    data_config, batch_size, split, workers, prefetch_factor,
+    steps = 100, warmup = 5
+):
+    """Iterate data loaders for `steps` batches and time them."""
+    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-locals
+    data_config.workers = workers
+
+    loaders = construct_data_loaders(
+        data_config, batch_size, split,
+        prefetch_factor = prefetch_factor,
+        wrap_dataset    = StageTimedDataset,
+    )
+
+    if isinstance(loaders, list):
+        loaders = zip(*loaders)
+
+    start   = time.perf_counter()
+    it      = iter(loaders)
+    timings = []
+    samples = 0
+
+    for _ in itertools.islice(it, warmup):
+        pass
+
+    first_batch = time.perf_counter() - start
+    start       = time.perf_counter()
+
+    for batch in itertools.islice(it, steps):
+        samples += count_samples(batch)
+        collect_timings(batch, timings)
+
+    elapsed = time.perf_counter() - start
+    stages  = summarize_timings(timings) if timings else None
+    del it
+
+    return {
+        'workers'             : workers,
+        'prefetch_factor'     : prefetch_factor,
+        'batch_size'          : batch_size,
+        'startup_sec'         : first_batch,
+        'samples_per_sec'     : samples / elapsed if elapsed > 0 else None,
+        'stages'              : stages,
+        'max_rss_mb'          : get_max_rss_mb(),
+        'max_rss_children_mb' : get_max_rss_mb(children = True),
+    }
+
+def load_config(path):
+    if os.path.isdir(path):
+        return Config.load(path)
+
+    with open(path, 'rt', encoding = 'utf-8') as f:
+        return Config(**json.load(f))
+
+def parse_cmdargs():
+    parser = argparse.ArgumentParser(
+        description = 'Benchmark data loading pipeline of a training config'
+    )
+
+    parser.add_argument(
+        'config',
+        help    = 'model directory or path to a config JSON file',
+        metavar = 'CONFIG',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--split',
+        choices = [ SPLIT_TRAIN, SPLIT_TEST, SPLIT_VAL ],
+        default = SPLIT_TRAIN,
+        dest    = 'split',
+        help    = f'data split (default = {SPLIT_TRAIN})',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--batch-size',
+        default = None,
+        dest    = 'batch_size',
+        help    = 'batch size (default = batch size of the config)',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--workers',
+        default = None,
+        dest    = 'workers',
+        help    = 'list of worker counts to sweep (default = config value)',
+        nargs   = '+',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--prefetch',
+        default = [ 20 ],
+        dest    = 'prefetch',
+        help    = 'list of prefetch factors to sweep (default = 20)',
+        nargs   = '+',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--steps',
+        default = 100,
+        dest    = 'steps',
+        help    = 'number of batches to time (default = 100)',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--warmup',
+        default = 5,
+        dest    = 'warmup',
+        help    = 'number of batches to skip before timing (default = 5)',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        default = None,
+        dest    = 'output',
+        help    = 'save results to a JSON file',
+        type    = str,
+    )
+
+    return parser.parse_args()
+
+def main():
+    cmdargs = parse_cmdargs()
+    config  = load_config(cmdargs.config)
+
+    batch_size = cmdargs.batch_size or config.batch_size
+    workers    = cmdargs.workers or [ config.data.workers ]
+    results    = []
+
+    for (n_workers, prefetch) in itertools.product(workers, cmdargs.prefetch):
+        result = bench_data(
+            config.data, batch_size, cmdargs.split, n_workers, prefetch,
+            cmdargs.steps, cmdargs.warmup
+        )
+        results.append(result)
+
+        print(json.dumps(result, indent = 4))
+
+    if cmdargs.output is not None:
+        with open(cmdargs.output, 'wt', encoding = 'utf-8') as f:
+            json.dump(results, f, indent = 4)
+
+if __name__ == '__main__':
+    main()
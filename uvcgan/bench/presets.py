@@ -0,0 +1,57 @@
+WEIGHT_INIT = { 'name' : 'normal', 'init_gain' : 0.02 }
+
+GEN_PRESETS = {
+    'vit-v0' : {
+        'model'      : 'vit-v0',
+        'model_args' : {
+            'features'       : 384,
+            'n_heads'        : 6,
+            'n_blocks'       : 6,
+            'ffn_features'   : 1536,
+            'embed_features' : 384,
+            'activ'          : 'gelu',
+            'norm'           : 'layer',
+            'token_size'     : (16, 16),
+            'rescale'        : False,
+            'rezero'         : True,
+        },
+    },
+    'vit-unet' : {
+        'model'      : 'vit-unet',
+        'model_args' : {
+            'features'           : 384,
+            'n_heads'            : 6,
+            'n_blocks'           : 12,
+            'ffn_features'       : 1536,
+            'embed_features'     : 384,
+            'activ'              : 'gelu',
+            'norm'               : 'layer',
+            'unet_features_list' : [48, 96, 192, 384],
+            'unet_activ'         : 'leakyrelu',
+            'unet_norm'          : None,
+            'unet_downsample'    : 'conv',
+            'unet_upsample'      : 'upsample-conv',
+            'rezero'             : True,
+            'activ_output'       : None,
+        },
+    },
+    'resnet_9blocks' : { 'model' : 'resnet_9blocks', 'model_args' : None },
+    'resnet_6blocks' : { 'model' : 'resnet_6blocks', 'model_args' : None },
+    'unet_128'       : { 'model' : 'unet_128',       'model_args' : None },
+    'unet_256'       : { 'model' : 'unet_256',       'model_args' : None },
+}
+
+DISC_PRESETS = {
+    'basic'    : { 'model' : 'basic',    'model_args' : None },
+    'n_layers' : { 'model' : 'n_layers', 'model_args' : { 'n_layers' : 4 } },
+    'pixel'    : { 'model' : 'pixel',    'model_args' : None },
+}
+
+def get_model_config_dict(presets, name):
+    if name not in presets:
+        raise ValueError("Unknown benchmark preset: '%s'" % name)
+
+    result = dict(presets[name])
+    result.setdefault('weight_init', WEIGHT_INIT)
+
+    return result
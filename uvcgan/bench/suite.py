@@ -0,0 +1,168 @@
+import logging
+
+import torch
+
+from uvcgan.config               import Config
+from uvcgan.cgan                 import construct_model
+from uvcgan.config.model_config  import ModelConfig
+from uvcgan.models.discriminator import construct_discriminator
+from uvcgan.models.generator     import construct_generator
+
+from .presets import GEN_PRESETS, DISC_PRESETS, get_model_config_dict
+from .timing  import benchmark
+
+LOGGER = logging.getLogger('uvcgan.bench')
+
+KIND_GEN  = 'generator'
+KIND_DISC = 'discriminator'
+KIND_STEP = 'step'
+
+PASS_FORWARD          = 'forward'
+PASS_FORWARD_BACKWARD = 'forward_backward'
+
+# NOTE: forward + backward timings of older results were named 'backward'
+LEGACY_PASS_NAMES = { PASS_FORWARD_BACKWARD : 'backward' }
+
+def construct_network(kind, preset, image_shape, device):
+    if kind == KIND_GEN:
+        config = ModelConfig(**get_model_config_dict(GEN_PRESETS, preset))
+        return construct_generator(config, image_shape, image_shape, device)
+
+    if kind == KIND_DISC:
+        config = ModelConfig(**get_model_config_dict(DISC_PRESETS, preset))
+        return construct_discriminator(config, image_shape, device)
+
+    raise ValueError("Unknown network kind: '%s'" % kind)
+
+def bench_network(
+    kind, preset, image_shape, batch_size, device, warmup = 3, repeats = 10
+):
+    """Time forward and forward + backward passes of a single network."""
+    # pylint: disable=too-many-arguments
+    model = construct_network(kind, preset, image_shape, device)
+    x     = torch.randn((batch_size, *image_shape), device = device)
+
+    def forward():
+        with torch.no_grad():
+            model(x)
+
+    def forward_backward():
+        model.zero_grad(set_to_none = True)
+        model(x).mean().backward()
+
+    return {
+        PASS_FORWARD : benchmark(
+            forward, device, batch_size, warmup, repeats
+        ),
+        PASS_FORWARD_BACKWARD : benchmark(
+            forward_backward, device, batch_size, warmup, repeats
+        ),
+    }
+
+def construct_benchmark_config(gen, disc, image_shape, batch_size):
+    return Config(
+        batch_size = batch_size,
+        data       = {
+            'datasets' : [
+                { 'dataset' : 'benchmark', 'shape' : image_shape, }
+                    for _ in range(2)
+            ],
+            'merge_type' : 'unpaired',
+        },
+        generator        = get_model_config_dict(GEN_PRESETS, gen),
+        discriminator    = get_model_config_dict(DISC_PRESETS, disc),
+        model            = 'cyclegan',
+        loss             = 'lsgan',
+        gradient_penalty = { 'constant' : 1.0, 'lambda_gp' : 1.0 },
+    )
+
+def bench_model_step(
+    gen, disc, image_shape, batch_size, device, warmup = 3, repeats = 10
+):
+    """Time full CycleGAN `optimization_step` with given networks."""
+    # pylint: disable=too-many-arguments
+    config = construct_benchmark_config(gen, disc, image_shape, batch_size)
+    model  = construct_model(None, config, is_train = True, device = device)
+    batch  = [
+        torch.randn((batch_size, *image_shape)) for _ in range(2)
+    ]
+
+    def step():
+        model.set_input(batch)
+        model.optimization_step()
+
+    model.train()
+
+    return benchmark(step, device, batch_size, warmup, repeats)
+
+def run_benchmarks(
+    gens, discs, image_shape, batch_size, device,
+    warmup = 3, repeats = 10, model_step = True
+):
+    """Run benchmark suite.
+
+    Returns a dict `{ name : { measurement : value } }`, where name is of
+    the form `KIND/PRESET/PASS`.
+    """
+    # pylint: disable=too-many-arguments
+    result = {}
+
+    for (kind, presets) in [ (KIND_GEN, gens), (KIND_DISC, discs) ]:
+        for preset in presets:
+            LOGGER.info('Benchmarking %s %s', kind, preset)
+
+            values = bench_network(
+                kind, preset, image_shape, batch_size, device, warmup, repeats
+            )
+
+            for (name, v) in values.items():
+                result[f'{kind}/{preset}/{name}'] = v
+
+    if model_step and discs:
+        for gen in gens:
+            LOGGER.info('Benchmarking optimization step of %s', gen)
+
+            result[f'{KIND_STEP}/{gen}/{discs[0]}'] = bench_model_step(
+                gen, discs[0], image_shape, batch_size, device,
+                warmup, repeats
+            )
+
+    return result
+
+def get_baseline_name(name, baseline):
+    """Find the name of `name` benchmark in `baseline`, if any."""
+    if name in baseline:
+        return name
+
+    prefix, _, pass_name = name.rpartition('/')
+
+    if pass_name in LEGACY_PASS_NAMES:
+        legacy_name = f'{prefix}/{LEGACY_PASS_NAMES[pass_name]}'
+
+        if legacy_name in baseline:
+            return legacy_name
+
+    return None
+
+def compare_to_baseline(
+    results, baseline, tolerance = 0.1, key = 'latency_p50_ms'
+):
+    """Find benchmarks with `key` worse than baseline by more than tolerance.
+
+    Returns a list of `(name, baseline_value, value)` tuples.
+    """
+    regressions = []
+
+    for (name, values) in results.items():
+        base_name = get_baseline_name(name, baseline)
+
+        if base_name is None:
+            continue
+
+        base  = baseline[base_name][key]
+        value = values[key]
+
+        if value > base * (1 + tolerance):
+            regressions.append((name, base, value))
+
+    return regressions
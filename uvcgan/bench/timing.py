@@ -0,0 +1,54 @@
+import time
+
+import numpy as np
+import torch
+
+def synchronize(device):
+    if torch.device(device).type == 'cuda':
+        torch.cuda.synchronize(device)
+
+def reset_peak_memory(device):
+    if torch.device(device).type == 'cuda':
+        torch.cuda.reset_peak_memory_stats(device)
+
+def get_peak_memory_mb(device):
+    if torch.device(device).type == 'cuda':
+        return torch.cuda.max_memory_allocated(device) / 1024**2
+
+    return None
+
+def time_function(fn, device, warmup = 3, repeats = 10):
+    """Return a list of wall times [s] of `repeats` calls of `fn`."""
+    for _ in range(warmup):
+        fn()
+
+    synchronize(device)
+    result = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        synchronize(device)
+        result.append(time.perf_counter() - start)
+
+    return result
+
+def summarize_times(times, batch_size):
+    times = np.array(times)
+
+    return {
+        'latency_mean_ms' : 1000 * float(np.mean(times)),
+        'latency_p50_ms'  : 1000 * float(np.percentile(times, 50)),
+        'latency_p90_ms'  : 1000 * float(np.percentile(times, 90)),
+        'latency_p99_ms'  : 1000 * float(np.percentile(times, 99)),
+        'images_per_sec'  : batch_size / float(np.mean(times)),
+    }
+
+def benchmark(fn, device, batch_size, warmup = 3, repeats = 10):
+    reset_peak_memory(device)
+
+    times  = time_function(fn, device, warmup, repeats)
+    result = summarize_times(times, batch_size)
+    result['max_mem_mb'] = get_peak_memory_mb(device)
+
+    return result
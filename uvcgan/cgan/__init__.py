@@ -18,10 +18,10 @@ def select_model(name, **kwargs):
 
     raise ValueError("Unknown model: %s" % name)
 
-def construct_model(savedir, config, is_train, device):
+def construct_model(savedir, config, is_train, device, skip_init = False):
     model = select_model(
         config.model, savedir = savedir, config = config, is_train = is_train,
-        device = device, **config.model_args
+        device = device, skip_init = skip_init, **config.model_args
     )
 
     return model
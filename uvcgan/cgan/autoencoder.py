@@ -31,7 +31,8 @@ class Autoencoder(ModelBase):
 
             return NamedDict(
                 encoder = construct_generator(
-                    config.generator, image_shape, image_shape, self.device
+                    config.generator, image_shape, image_shape, self.device,
+                    skip_init = self.skip_init
                 )
             )
 
@@ -40,13 +41,15 @@ class Autoencoder(ModelBase):
             config.generator,
             config.data.datasets[0].shape,
             config.data.datasets[0].shape,
-            self.device
+            self.device,
+            skip_init = self.skip_init
         )
         models.encoder_b = construct_generator(
             config.generator,
             config.data.datasets[1].shape,
             config.data.datasets[1].shape,
-            self.device
+            self.device,
+            skip_init = self.skip_init
         )
 
         return models
@@ -81,7 +84,8 @@ class Autoencoder(ModelBase):
 
     def __init__(
         self, savedir, config, is_train, device,
-        joint = False, background_penalty = None, masking = None
+        joint = False, background_penalty = None, masking = None,
+        skip_init = False
     ):
         # pylint: disable=too-many-arguments
         self.joint   = joint
@@ -90,7 +94,7 @@ class Autoencoder(ModelBase):
         assert len(config.data.datasets) == 2, \
             "Autoencoder expects a pair of datasets"
 
-        super().__init__(savedir, config, is_train, device)
+        super().__init__(savedir, config, is_train, device, skip_init)
 
         if background_penalty is None:
             self.background_penalty = None
@@ -109,6 +113,22 @@ class Autoencoder(ModelBase):
     def _set_input(self, inputs, domain):
         set_two_domain_input(self.images, inputs, domain, self.device)
 
+    def _inference_graph(self):
+        # NOTE: masking is random and is not a part of the inference graph
+        if self.masking is not None:
+            return None
+
+        if self.joint:
+            return {
+                'reco_a' : ('encoder', 'real_a'),
+                'reco_b' : ('encoder', 'real_b'),
+            }
+
+        return {
+            'reco_a' : ('encoder_a', 'real_a'),
+            'reco_b' : ('encoder_b', 'real_b'),
+        }
+
     def forward(self):
         input_a = self.images.real_a
         input_b = self.images.real_b
@@ -154,13 +174,16 @@ class Autoencoder(ModelBase):
         )
 
     def optimization_step(self):
-        self.forward()
+        with self.timed('forward'):
+            self.forward()
 
         for optimizer in self.optimizers.values():
             optimizer.zero_grad()
 
-        self.backward_generators()
+        with self.timed('backward'):
+            self.backward_generators()
 
-        for optimizer in self.optimizers.values():
-            optimizer.step()
+        with self.timed('optimizer'):
+            for optimizer in self.optimizers.values():
+                optimizer.step()
 
@@ -1,8 +1,15 @@
+import logging
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+
 import torch
 
-CHECKPOINTS_DIR = 'checkpoints'
+CHECKPOINTS_DIR     = 'checkpoints'
+CONSOLIDATED_PREFIX = 'ckpt'
+CONSOLIDATED_NAME   = CONSOLIDATED_PREFIX + '_all'
+
+LOGGER = logging.getLogger('uvcgan.cgan')
 
 def find_last_checkpoint_epoch(savedir, prefix = None):
     root = os.path.join(savedir, CHECKPOINTS_DIR)
@@ -39,6 +46,69 @@ def get_save_path(savedir, name, epoch, mkdir = False):
 
     return result
 
+def list_checkpoint_epochs(savedir):
+    root = os.path.join(savedir, CHECKPOINTS_DIR)
+    if not os.path.exists(root):
+        return []
+
+    r      = re.compile(r'(\d+)_.*\.pth$')
+    result = set()
+
+    for fname in os.listdir(root):
+        m = r.match(fname)
+        if m:
+            result.add(int(m.groups()[0]))
+
+    return sorted(result)
+
+def has_final_checkpoint(savedir):
+    if not os.path.isdir(savedir):
+        return False
+
+    return any(fname.endswith('.pth') for fname in os.listdir(savedir))
+
+def remove_checkpoint(savedir, epoch):
+    root   = os.path.join(savedir, CHECKPOINTS_DIR)
+    prefix = '%04d_' % epoch
+
+    for fname in os.listdir(root):
+        if fname.startswith(prefix) and fname.endswith('.pth'):
+            os.remove(os.path.join(root, fname))
+
+def load_file(path, device, mmap = False):
+    """Load a checkpoint file.
+
+    If `mmap` is True, the tensors are memory-mapped instead of being read
+    into memory, so that only the entries that are actually used get
+    materialized. The tensors are copied to the `device` by
+    `load_state_dict`. Requires torch >= 2.1, falls back to a regular load
+    otherwise.
+    """
+    if mmap:
+        try:
+            return torch.load(path, map_location = 'cpu', mmap = True)
+        except TypeError:
+            LOGGER.debug('torch.load does not support mmap. Disabling.')
+        except RuntimeError as e:
+            LOGGER.debug("Failed to mmap '%s': %s", path, e)
+
+    return torch.load(path, map_location = device)
+
+def get_consolidated_save_path(savedir, epoch, mkdir = False):
+    return get_save_path(savedir, CONSOLIDATED_NAME, epoch, mkdir)
+
+def get_state_dict(obj):
+    if isinstance(obj, torch.nn.DataParallel):
+        return obj.module.state_dict()
+
+    return obj.state_dict()
+
+def load_state_dict(obj, state_dict):
+    if isinstance(obj, torch.nn.DataParallel):
+        obj.module.load_state_dict(state_dict)
+    else:
+        obj.load_state_dict(state_dict)
+
 def save(named_dict, savedir, prefix, epoch = None):
     for (k,v) in named_dict.items():
         if v is None:
@@ -48,12 +118,13 @@ def save(named_dict, savedir, prefix, epoch = None):
             savedir, prefix + '_' + k, epoch, mkdir = True
         )
 
-        if isinstance(v, torch.nn.DataParallel):
-            torch.save(v.module.state_dict(), save_path)
-        else:
-            torch.save(v.state_dict(), save_path)
+        torch.save(get_state_dict(v), save_path)
 
-def load(named_dict, savedir, prefix, epoch, device):
+def load(
+    named_dict, savedir, prefix, epoch, device,
+    missing_ok = False, mmap = False
+):
+    # pylint: disable=too-many-arguments
     for (k,v) in named_dict.items():
         if v is None:
             continue
@@ -62,12 +133,122 @@ def load(named_dict, savedir, prefix, epoch, device):
             savedir, prefix + '_' + k, epoch, mkdir = False
         )
 
-        if isinstance(v, torch.nn.DataParallel):
-            v.module.load_state_dict(
-                torch.load(load_path, map_location = device)
-            )
-        else:
-            v.load_state_dict(
-                torch.load(load_path, map_location = device)
-            )
+        if missing_ok and (not os.path.exists(load_path)):
+            continue
+
+        load_state_dict(v, load_file(load_path, device, mmap))
+
+def collect_state(groups):
+    """Collect state dicts of `{ prefix : named_dict }` groups."""
+    return {
+        prefix : {
+            k : get_state_dict(v) for (k,v) in named_dict.items()
+                if v is not None
+        }
+        for (prefix, named_dict) in groups.items()
+    }
+
+def apply_state(groups, state, optional_prefixes = ()):
+    """Load state of `{ prefix : named_dict }` groups."""
+    for (prefix, named_dict) in groups.items():
+        group_state = state.get(prefix, {})
+
+        for (k,v) in named_dict.items():
+            if v is None:
+                continue
+
+            if k not in group_state:
+                if prefix in optional_prefixes:
+                    continue
+
+                raise KeyError(
+                    "Checkpoint does not contain state of '%s_%s'"
+                    % (prefix, k)
+                )
+
+            load_state_dict(v, group_state[k])
+
+def snapshot_to_host(obj):
+    """Copy all tensors in a (nested) state dict to the host memory.
+
+    The `_metadata` of module state dicts is kept, since it holds the
+    versions used by the `_load_from_state_dict` hooks.
+    """
+    if torch.is_tensor(obj):
+        return obj.detach().to('cpu', copy = True)
+
+    if isinstance(obj, dict):
+        result   = type(obj)((k, snapshot_to_host(v)) for (k,v) in obj.items())
+        metadata = getattr(obj, '_metadata', None)
+
+        if metadata is not None:
+            # pylint: disable=protected-access
+            result._metadata = metadata
+
+        return result
+
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(snapshot_to_host(x) for x in obj)
+
+    return obj
+
+def fsync_dir(path):
+    # NOTE: directories cannot be opened on Windows, skipping
+    if os.name == 'nt':
+        return
+
+    fd = os.open(path, os.O_RDONLY)
+
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def save_atomic(obj, path):
+    """Save `obj` to a temporary file and rename it to `path`.
+
+    The temporary file starts with a dot, so that partially written
+    checkpoints are never picked up by `find_last_checkpoint_epoch`. The
+    file and the directory are synced to the disk, so that the renamed
+    checkpoint is complete even after a crash or a power loss.
+    """
+    root, fname = os.path.split(path)
+    tmp_path    = os.path.join(root, '.' + fname + '.tmp')
+
+    with open(tmp_path, 'wb') as f:
+        torch.save(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+    fsync_dir(root or '.')
+
+class AsyncCheckpointWriter:
+    """Serialize checkpoints in a background thread.
+
+    `save` copies the state to the host memory in the calling thread and
+    returns immediately, while the serialization is performed by a
+    background thread. Only one checkpoint is written at a time: `save`
+    waits for the previous write to finish before taking a new snapshot.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers = 1)
+        self._future   = None
+
+    def wait(self):
+        if self._future is not None:
+            future       = self._future
+            self._future = None
+            future.result()
+
+    def save(self, state, path):
+        self.wait()
+
+        state        = snapshot_to_host(state)
+        self._future = self._executor.submit(save_atomic, state, path)
+
+    def close(self):
+        self.wait()
+        self._executor.shutdown()
 
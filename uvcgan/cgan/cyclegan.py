@@ -11,14 +11,23 @@ import itertools
 import torch
 
 from uvcgan.torch.select         import select_optimizer
+from uvcgan.torch.image_pool     import TensorImagePool
 from uvcgan.base.image_pool      import ImagePool
-from uvcgan.base.losses          import GANLoss, cal_gradient_penalty
+from uvcgan.base.losses          import GANLoss
 from uvcgan.models.discriminator import construct_discriminator
 from uvcgan.models.generator     import construct_generator
 
 from .model_base import ModelBase
 from .named_dict import NamedDict
-from .funcs import set_two_domain_input
+from .gradient_penalty import (
+    construct_gradient_penalty, gradient_penalty_group, PREFIX_GP
+)
+from .funcs import (
+    set_two_domain_input, batched_apply, eval_discriminator_fused,
+    check_batch_independent
+)
+
+PREFIX_POOL = 'pool'
 
 class CycleGANModel(ModelBase):
     # pylint: disable=too-many-instance-attributes
@@ -38,25 +47,29 @@ class CycleGANModel(ModelBase):
             config.generator,
             config.data.datasets[0].shape,
             config.data.datasets[1].shape,
-            self.device
+            self.device,
+            skip_init = self.skip_init
         )
         models['gen_ba'] = construct_generator(
             config.generator,
             config.data.datasets[1].shape,
             config.data.datasets[0].shape,
-            self.device
+            self.device,
+            skip_init = self.skip_init
         )
 
         if self.is_train:
             models['disc_a'] = construct_discriminator(
                 config.discriminator,
                 config.data.datasets[0].shape,
-                self.device
+                self.device,
+                skip_init = self.skip_init
             )
             models['disc_b'] = construct_discriminator(
                 config.discriminator,
                 config.data.datasets[1].shape,
-                self.device
+                self.device,
+                skip_init = self.skip_init
             )
 
         return NamedDict(**models)
@@ -94,31 +107,120 @@ class CycleGANModel(ModelBase):
 
     def __init__(
         self, savedir, config, is_train, device, pool_size = 50,
-        lambda_a = 10.0, lambda_b = 10.0, lambda_idt = 0.5
+        lambda_a = 10.0, lambda_b = 10.0, lambda_idt = 0.5,
+        fused_step = False, fused_disc = False,
+        pool_type = 'list', pool_pin_memory = False, skip_init = False
     ):
         # pylint: disable=too-many-arguments
         self.lambda_a   = lambda_a
         self.lambda_b   = lambda_b
         self.lambda_idt = lambda_idt
+        self.fused_step = fused_step
+        self.fused_disc = fused_disc
 
         assert len(config.data.datasets) == 2, \
             "CycleGAN expects a pair of datasets"
 
-        super().__init__(savedir, config, is_train, device)
+        super().__init__(savedir, config, is_train, device, skip_init)
+
+        if fused_step:
+            check_batch_independent(
+                self.models, [ 'gen_ab', 'gen_ba' ], 'fused_step'
+            )
+
+        if fused_disc:
+            check_batch_independent(
+                self.models, [ 'disc_a', 'disc_b' ], 'fused_disc'
+            )
 
         self.criterion_gan    = GANLoss(config.loss).to(self.device)
-        self.gradient_penalty = config.gradient_penalty
+        self.gradient_penalty = construct_gradient_penalty(
+            config.gradient_penalty
+        )
         self.criterion_cycle  = torch.nn.L1Loss()
         self.criterion_idt    = torch.nn.L1Loss()
 
+        self.pools = NamedDict()
+
         if self.is_train:
-            self.pred_a_pool = ImagePool(pool_size)
-            self.pred_b_pool = ImagePool(pool_size)
+            self.pools = NamedDict(
+                a = self._construct_pool(
+                    pool_type, pool_size, config.data.datasets[0].shape,
+                    pool_pin_memory
+                ),
+                b = self._construct_pool(
+                    pool_type, pool_size, config.data.datasets[1].shape,
+                    pool_pin_memory
+                ),
+            )
+
+            self.pred_a_pool = self.pools.a
+            self.pred_b_pool = self.pools.b
+
+    def _construct_pool(self, pool_type, pool_size, image_shape, pin_memory):
+        if pool_type == 'list':
+            return ImagePool(pool_size)
+
+        if pool_type == 'tensor':
+            return TensorImagePool(
+                pool_size, image_shape, self.device, pin_memory
+            )
+
+        raise ValueError(f"Unknown image pool type: '{pool_type}'")
+
+    def _stateful_pools(self):
+        return NamedDict(**{
+            k : v for (k, v) in self.pools.items()
+                if isinstance(v, TensorImagePool)
+        })
+
+    def _checkpoint_groups(self):
+        result = super()._checkpoint_groups()
+        result[PREFIX_POOL] = self._stateful_pools()
+        result[PREFIX_GP]   = gradient_penalty_group(self.gradient_penalty)
+
+        return result
 
     def _set_input(self, inputs, domain):
         set_two_domain_input(self.images, inputs, domain, self.device)
 
+    def _inference_graph(self):
+        return {
+            'fake_b' : ('gen_ab', 'real_a'),
+            'reco_a' : ('gen_ba', 'fake_b'),
+            'fake_a' : ('gen_ba', 'real_b'),
+            'reco_b' : ('gen_ab', 'fake_a'),
+        }
+
+    def _can_fuse_forward(self):
+        return (
+                self.fused_step
+            and self.is_train
+            and (self.lambda_idt > 0)
+            and (self.images.real_a is not None)
+            and (self.images.real_b is not None)
+        )
+
+    def forward_fused(self):
+        # Translations and identity mappings are independent of each other
+        # and can be evaluated in a single generator pass. The cycle
+        # reconstructions depend on the translations and cannot be fused.
+        self.images.fake_b, self.images.idt_b = batched_apply(
+            self.models.gen_ab, self.images.real_a, self.images.real_b
+        )
+
+        self.images.fake_a, self.images.idt_a = batched_apply(
+            self.models.gen_ba, self.images.real_b, self.images.real_a
+        )
+
+        self.images.reco_a = self.models.gen_ba(self.images.fake_b)
+        self.images.reco_b = self.models.gen_ab(self.images.fake_a)
+
     def forward(self):
+        if self._can_fuse_forward():
+            self.forward_fused()
+            return
+
         def simple_fwd(batch, gen_fwd, gen_bkw):
             if batch is None:
                 return (None, None)
@@ -136,7 +238,23 @@ class CycleGANModel(ModelBase):
             self.images.real_b, self.models.gen_ba, self.models.gen_ab
         )
 
+    def backward_discriminator_fused(self, model, real, fake):
+        pred_real, pred_fake, loss_gp = eval_discriminator_fused(
+            model, real, fake, self.gradient_penalty
+        )
+
+        loss_real = self.criterion_gan(pred_real, True)
+        loss_fake = self.criterion_gan(pred_fake, False)
+
+        loss = (loss_real + loss_fake) * 0.5 + loss_gp
+
+        loss.backward()
+        return loss
+
     def backward_discriminator_base(self, model, real, fake):
+        if self.fused_disc:
+            return self.backward_discriminator_fused(model, real, fake)
+
         pred_real = model(real)
         loss_real = self.criterion_gan(pred_real, True)
 
@@ -157,9 +275,7 @@ class CycleGANModel(ModelBase):
         loss = (loss_real + loss_fake) * 0.5
 
         if self.gradient_penalty is not None:
-            loss += cal_gradient_penalty(
-                model, real, fake, real.device, **self.gradient_penalty
-            )[0]
+            loss += self.gradient_penalty(model, real, fake)
 
         loss.backward()
         return loss
@@ -200,12 +316,16 @@ class CycleGANModel(ModelBase):
         )
 
         if lambda_idt > 0:
-            self.images.idt_b = self.models.gen_ab(self.images.real_b)
+            if self.images.idt_b is None:
+                self.images.idt_b = self.models.gen_ab(self.images.real_b)
+
+            if self.images.idt_a is None:
+                self.images.idt_a = self.models.gen_ba(self.images.real_a)
+
             self.losses.idt_b = lambda_b * lambda_idt * self.criterion_idt(
                 self.images.idt_b, self.images.real_b
             )
 
-            self.images.idt_a = self.models.gen_ba(self.images.real_a)
             self.losses.idt_a = lambda_a * lambda_idt * self.criterion_idt(
                 self.images.idt_a, self.images.real_a
             )
@@ -215,17 +335,29 @@ class CycleGANModel(ModelBase):
         loss.backward()
 
     def optimization_step(self):
-        self.forward()
+        with self.timed('forward'):
+            self.forward()
 
         # Generators
         self.set_requires_grad([self.models.disc_a, self.models.disc_b], False)
         self.optimizers.gen.zero_grad()
-        self.backward_generators()
-        self.optimizers.gen.step()
+
+        with self.timed('backward_gen'):
+            self.backward_generators()
+
+        with self.timed('optimizer_gen'):
+            self.optimizers.gen.step()
 
         # Discriminators
         self.set_requires_grad([self.models.disc_a, self.models.disc_b], True)
         self.optimizers.disc.zero_grad()
-        self.backward_discriminators()
-        self.optimizers.disc.step()
+
+        with self.timed('backward_disc'):
+            self.backward_discriminators()
+
+        with self.timed('optimizer_disc'):
+            self.optimizers.disc.step()
+
+        if self.gradient_penalty is not None:
+            self.gradient_penalty.end_step()
 
@@ -1,3 +1,4 @@
+import torch
 
 def set_two_domain_input(images, inputs, domain, device):
     if (domain is None) or (domain == 'both'):
@@ -16,3 +17,87 @@ def set_two_domain_input(images, inputs, domain, device):
             " Supported domains: 'a' (alias 0), 'b' (alias 1), or 'both'"
         )
 
+
+def uses_batch_norm(model):
+    # pylint: disable=protected-access
+    return any(
+        isinstance(m, torch.nn.modules.batchnorm._BatchNorm)
+            for m in model.modules()
+    )
+
+def check_batch_independent(models, names, option):
+    """Raise an error if any of the `models` uses batch normalization.
+
+    `option` is the name of the fused mode that requires the networks
+    `names` to treat samples independently.
+    """
+    for name in names:
+        if (name not in models) or (models[name] is None):
+            continue
+
+        if uses_batch_norm(models[name]):
+            raise ValueError(
+                f"`{option}` requires networks that treat samples"
+                f" independently, but '{name}' uses batch normalization"
+            )
+
+def batched_apply(model, *inputs):
+    """Apply `model` to concatenated `inputs` and split the outputs back.
+
+    NOTE: this is equivalent to applying `model` to each of the `inputs`
+    separately only if the `model` treats samples independently (e.g. uses
+    instance or layer normalization, but not batch normalization).
+    """
+    sizes  = [ x.shape[0] for x in inputs ]
+    result = model(torch.cat(inputs, dim = 0))
+
+    return result.split(sizes, dim = 0)
+
+def eval_discriminator_fused(model, real, fake, gradient_penalty = None):
+    """Evaluate discriminator on `real` and `fake` samples in a single pass.
+
+    If the gradient penalty is evaluated at either real or fake samples,
+    then the same discriminator pass is reused to calculate the penalty.
+    Penalties of the 'mixed' type require a separate discriminator pass.
+
+    Returns
+    -------
+    (pred_real, pred_fake, loss_gp)
+    """
+    fake = fake.detach()
+    n    = real.shape[0]
+
+    if (gradient_penalty is None) or (not gradient_penalty.active):
+        pred_real, pred_fake = batched_apply(model, real, fake)
+        return (pred_real, pred_fake, 0)
+
+    if gradient_penalty.type not in [ 'real', 'fake' ]:
+        pred_real, pred_fake = batched_apply(model, real, fake)
+        loss_gp = gradient_penalty(model, real, fake)
+
+        return (pred_real, pred_fake, loss_gp)
+
+    batch = torch.cat([ real, fake ], dim = 0)
+    batch.requires_grad_(True)
+
+    pred = model(batch)
+    pred_real, pred_fake = pred.split([ n, fake.shape[0] ], dim = 0)
+
+    if gradient_penalty.type == 'real':
+        pred_gp  = gradient_penalty.select(pred_real)
+        index_gp = slice(0, n)
+    else:
+        pred_gp  = gradient_penalty.select(pred_fake)
+        index_gp = slice(n, None)
+
+    # NOTE: samples are independent, hence gradients of `pred_gp` with
+    #       respect to the other part of the `batch` vanish.
+    gradients = torch.autograd.grad(
+        outputs = pred_gp, inputs = batch,
+        grad_outputs = torch.ones_like(pred_gp),
+        create_graph = True, retain_graph = True, only_inputs = True
+    )[0]
+
+    loss_gp = gradient_penalty.calc_from_gradients(gradients[index_gp])
+
+    return (pred_real, pred_fake, loss_gp)
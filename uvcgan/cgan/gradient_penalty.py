@@ -0,0 +1,104 @@
+from uvcgan.base.losses import (
+    cal_gradient_penalty, calc_gradient_penalty_from_gradients
+)
+
+from .named_dict import NamedDict
+
+PREFIX_GP = 'gp'
+
+class GradientPenalty:
+    """Gradient penalty with an optional lazy regularization schedule.
+
+    Parameters
+    ----------
+    type : str
+        Where to evaluate the gradient penalty. Choices: 'real', 'fake',
+        'mixed'. Default: 'mixed'.
+    constant : float
+        The constant used in formula: (||gradient||_2 - constant)^2.
+        Default: 1.0.
+    lambda_gp : float
+        Weight of the gradient penalty. Default: 10.0.
+    interval : int
+        Apply the gradient penalty only every `interval` training steps. The
+        penalty weight is multiplied by `interval` to compensate for the
+        skipped steps. Default: 1.
+    sub_batch : int or None
+        If not None, evaluate the gradient penalty only on the first
+        `sub_batch` samples of each batch. Default: None.
+    """
+
+    def __init__(
+        self,
+        type      = 'mixed',
+        constant  = 1.0,
+        lambda_gp = 10.0,
+        interval  = 1,
+        sub_batch = None,
+    ):
+        # pylint: disable=redefined-builtin
+        # pylint: disable=too-many-arguments
+        if interval < 1:
+            raise ValueError(
+                f"Gradient penalty interval must be positive: {interval}"
+            )
+
+        self.type      = type
+        self.constant  = constant
+        self.lambda_gp = lambda_gp
+        self.interval  = interval
+        self.sub_batch = sub_batch
+
+        self._step = 0
+
+    @property
+    def active(self):
+        return (self.lambda_gp != 0) and (self._step % self.interval == 0)
+
+    @property
+    def effective_lambda_gp(self):
+        return self.lambda_gp * self.interval
+
+    def select(self, x):
+        if self.sub_batch is None:
+            return x
+
+        return x[:self.sub_batch]
+
+    def calc_from_gradients(self, gradients):
+        return calc_gradient_penalty_from_gradients(
+            self.select(gradients), self.constant, self.effective_lambda_gp
+        )
+
+    def end_step(self):
+        self._step += 1
+
+    def state_dict(self):
+        return { 'step' : self._step }
+
+    def load_state_dict(self, state_dict):
+        self._step = state_dict['step']
+
+    def __call__(self, model, real, fake):
+        if not self.active:
+            return 0
+
+        return cal_gradient_penalty(
+            model, self.select(real), self.select(fake), real.device,
+            type      = self.type,
+            constant  = self.constant,
+            lambda_gp = self.effective_lambda_gp,
+        )[0]
+
+def gradient_penalty_group(gradient_penalty):
+    """Checkpoint group with the lazy regularization state, if any."""
+    if gradient_penalty is None:
+        return NamedDict()
+
+    return NamedDict(gp = gradient_penalty)
+
+def construct_gradient_penalty(gradient_penalty):
+    if gradient_penalty is None:
+        return None
+
+    return GradientPenalty(**gradient_penalty)
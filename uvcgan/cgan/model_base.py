@@ -3,13 +3,18 @@
 #   https://github.com/junyanz/pytorch-CycleGAN-and-pix2pix
 # Please see `uvcgan/base/LICENSE` for copyright attribution and LICENSE
 
+import contextlib
 import logging
+import os
 import torch
 from torch.optim.lr_scheduler import ReduceLROnPlateau
 
 from uvcgan.base.schedulers import get_scheduler
 from .named_dict import NamedDict
-from .checkpoint import find_last_checkpoint_epoch, save, load
+from .checkpoint import (
+    find_last_checkpoint_epoch, save, load, load_file, collect_state,
+    apply_state, get_consolidated_save_path, CONSOLIDATED_PREFIX
+)
 
 PREFIX_MODEL = 'net'
 PREFIX_OPT   = 'opt'
@@ -20,10 +25,13 @@ LOGGER = logging.getLogger('uvcgan.cgan')
 class ModelBase:
     # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, savedir, config, is_train, device):
-        self.is_train = is_train
-        self.device   = device
-        self.savedir  = savedir
+    def __init__(self, savedir, config, is_train, device, skip_init = False):
+        # pylint: disable=too-many-arguments
+        self.is_train  = is_train
+        self.device    = device
+        self.savedir   = savedir
+        self.skip_init = skip_init
+        self.timer     = None
 
         self.models = self._setup_models(config)
         self.images = self._setup_images(config)
@@ -38,11 +46,19 @@ class ModelBase:
             self.optimizers = self._setup_optimizers(config)
             self.schedulers = self._setup_schedulers(config)
 
+    def timed(self, name):
+        """Time a code section with `self.timer`, if it is set."""
+        if self.timer is None:
+            return contextlib.nullcontext()
+
+        return self.timer.section(name)
+
     def set_input(self, inputs, domain = None):
         for key in self.images:
             self.images[key] = None
 
-        self._set_input(inputs, domain)
+        with self.timed('h2d'):
+            self._set_input(inputs, domain)
 
     def forward(self):
         raise NotImplementedError
@@ -73,6 +89,35 @@ class ModelBase:
 
         return NamedDict(**schedulers)
 
+    def _checkpoint_groups(self):
+        # NOTE: groups other than models, optimizers and schedulers are
+        #       optional when loading, to support older checkpoints.
+        return {
+            PREFIX_MODEL : self.models,
+            PREFIX_OPT   : self.optimizers,
+            PREFIX_SCHED : self.schedulers,
+        }
+
+    def _select_checkpoint_groups(self, models):
+        if models is None:
+            return self._checkpoint_groups()
+
+        for name in models:
+            if name not in self.models:
+                raise ValueError("Unknown model: '%s'" % name)
+
+        return {
+            PREFIX_MODEL : NamedDict(**{
+                name : self.models[name] for name in models
+            })
+        }
+
+    def _optional_checkpoint_prefixes(self):
+        return [
+            prefix for prefix in self._checkpoint_groups()
+                if prefix not in [ PREFIX_MODEL, PREFIX_OPT, PREFIX_SCHED ]
+        ]
+
     def _save_model_state(self, epoch):
         pass
 
@@ -98,29 +143,144 @@ class ModelBase:
         with torch.no_grad():
             self.forward()
 
+    def _inference_graph(self):
+        """Return `{ output : (network, input) }` dependencies of images.
+
+        `output` image is computed by applying network `network` to the
+        image `input`. Models that return None do not support partial
+        inference, and `infer` falls back to the full `forward`.
+        """
+        # pylint: disable=no-self-use
+        return None
+
+    def _check_outputs(self, outputs):
+        for name in outputs:
+            if name not in self.images:
+                raise ValueError("Unknown image: '%s'" % name)
+
+    def required_models(self, outputs):
+        """Names of the networks that are needed to compute `outputs`."""
+        self._check_outputs(outputs)
+        graph = self._inference_graph()
+
+        if graph is None:
+            return list(self.models.keys())
+
+        result = []
+
+        for name in outputs:
+            while name in graph:
+                network, name = graph[name]
+
+                if network not in result:
+                    result.append(network)
+
+        return result
+
+    def _infer_image(self, graph, name):
+        if (self.images[name] is not None) or (name not in graph):
+            return self.images[name]
+
+        network, source = graph[name]
+        image = self._infer_image(graph, source)
+
+        if image is not None:
+            self.images[name] = self.models[network](image)
+
+        return self.images[name]
+
+    def infer(self, outputs):
+        """Compute only the `outputs` images in inference mode.
+
+        Only the networks on which `outputs` depend are evaluated.
+        Returns `{ output : image }` dict, where image is None if it cannot
+        be computed from the current input.
+        """
+        self._check_outputs(outputs)
+        graph = self._inference_graph()
+
+        with torch.inference_mode():
+            if graph is None:
+                self.forward()
+            else:
+                for name in outputs:
+                    self._infer_image(graph, name)
+
+        return { name : self.images[name] for name in outputs }
+
     def find_last_checkpoint_epoch(self):
-        return find_last_checkpoint_epoch(self.savedir, PREFIX_MODEL)
+        return max(
+            find_last_checkpoint_epoch(self.savedir, PREFIX_MODEL),
+            find_last_checkpoint_epoch(self.savedir, CONSOLIDATED_PREFIX),
+        )
+
+    def state_dict(self):
+        return collect_state(self._checkpoint_groups())
+
+    def load_state_dict(self, state, models = None):
+        apply_state(
+            self._select_checkpoint_groups(models), state,
+            self._optional_checkpoint_prefixes()
+        )
+
+    def _load_split(self, epoch, models, mmap):
+        optional_prefixes = self._optional_checkpoint_prefixes()
+        groups = self._select_checkpoint_groups(models)
+
+        for (prefix, group) in groups.items():
+            load(
+                group, self.savedir, prefix, epoch, self.device,
+                missing_ok = (prefix in optional_prefixes), mmap = mmap
+            )
 
-    def load(self, epoch):
+    def load(self, epoch, models = None, mmap = False):
+        """Load model checkpoint.
+
+        If `models` is not None, then only the networks with the given names
+        are loaded, skipping the rest of the networks, optimizers and
+        schedulers. If `mmap` is True, the checkpoint files are memory-mapped,
+        such that the skipped entries are never read from the disk.
+        """
         if (epoch is not None) and (epoch <= 0):
+            if self.skip_init:
+                raise RuntimeError(
+                    "Model constructed with `skip_init` requires weights to"
+                    " be loaded from a checkpoint, but no checkpoint is found"
+                    " in '%s'" % self.savedir
+                )
+
             return
 
         LOGGER.debug('Loading model from epoch %s', epoch)
 
-        load(self.models,     self.savedir, PREFIX_MODEL, epoch, self.device)
-        load(self.optimizers, self.savedir, PREFIX_OPT,   epoch, self.device)
-        load(self.schedulers, self.savedir, PREFIX_SCHED, epoch, self.device)
+        path = get_consolidated_save_path(self.savedir, epoch)
+
+        if os.path.exists(path):
+            self.load_state_dict(load_file(path, self.device, mmap), models)
+        else:
+            self._load_split(epoch, models, mmap)
 
         self.epoch = epoch
         self._load_model_state(epoch)
         self._handle_epoch_end()
 
-    def save(self, epoch = None):
+    def save(self, epoch = None, writer = None):
+        """Save model checkpoint.
+
+        If `writer` is None, then each model, optimizer and scheduler is
+        saved into a separate file. Otherwise, the `writer` is used to save
+        a single consolidated checkpoint file.
+        """
         LOGGER.debug('Saving model at epoch %s', epoch)
 
-        save(self.models,     self.savedir, PREFIX_MODEL, epoch)
-        save(self.optimizers, self.savedir, PREFIX_OPT,   epoch)
-        save(self.schedulers, self.savedir, PREFIX_SCHED, epoch)
+        if writer is None:
+            for (prefix, group) in self._checkpoint_groups().items():
+                save(group, self.savedir, prefix, epoch)
+        else:
+            writer.save(
+                self.state_dict(),
+                get_consolidated_save_path(self.savedir, epoch, mkdir = True)
+            )
 
         self._save_model_state(epoch)
 
@@ -166,11 +326,21 @@ class ModelBase:
             for param in model.parameters():
                 param.requires_grad = requires_grad
 
-    def get_current_losses(self):
+    def get_current_losses(self, sync = True):
+        """Return current loss values.
+
+        If `sync` is False, then the losses are returned as detached
+        tensors, and no device synchronization is performed.
+        """
         result = {}
 
         for (k,v) in self.losses.items():
-            result[k] = float(v)
+            if sync:
+                result[k] = float(v)
+            elif torch.is_tensor(v):
+                result[k] = v.detach()
+            else:
+                result[k] = v
 
         return result
 
@@ -10,13 +10,18 @@
 import torch
 
 from uvcgan.torch.select         import select_optimizer
-from uvcgan.base.losses          import GANLoss, cal_gradient_penalty
+from uvcgan.base.losses          import GANLoss
 from uvcgan.models.discriminator import construct_discriminator
 from uvcgan.models.generator     import construct_generator
 
 from .model_base import ModelBase
 from .named_dict import NamedDict
-from .funcs import set_two_domain_input
+from .gradient_penalty import (
+    construct_gradient_penalty, gradient_penalty_group, PREFIX_GP
+)
+from .funcs import (
+    set_two_domain_input, eval_discriminator_fused, check_batch_independent
+)
 
 class Pix2PixModel(ModelBase):
 
@@ -33,10 +38,12 @@ class Pix2PixModel(ModelBase):
             "Pix2Pix needs images in both domains to have the same size"
 
         models['gen_ab'] = construct_generator(
-            config.generator, image_shape_a, image_shape_b, self.device
+            config.generator, image_shape_a, image_shape_b, self.device,
+            skip_init = self.skip_init
         )
         models['gen_ba'] = construct_generator(
-            config.generator, image_shape_b, image_shape_a, self.device
+            config.generator, image_shape_b, image_shape_a, self.device,
+            skip_init = self.skip_init
         )
 
         if self.is_train:
@@ -46,7 +53,8 @@ class Pix2PixModel(ModelBase):
 
             for name in [ 'disc_a', 'disc_b' ]:
                 models[name] = construct_discriminator(
-                    config.discriminator, extended_image_shape, self.device
+                    config.discriminator, extended_image_shape, self.device,
+                    skip_init = self.skip_init
                 )
 
         return NamedDict(**models)
@@ -75,19 +83,43 @@ class Pix2PixModel(ModelBase):
 
         return optimizers
 
-    def __init__(self, savedir, config, is_train, device):
-        super().__init__(savedir, config, is_train, device)
+    def __init__(
+        self, savedir, config, is_train, device, fused_disc = False,
+        skip_init = False
+    ):
+        # pylint: disable=too-many-arguments
+        super().__init__(savedir, config, is_train, device, skip_init)
 
         assert len(config.data.datasets) == 2, \
             "Pix2Pix expects a pair of datasets"
 
+        if fused_disc:
+            check_batch_independent(
+                self.models, [ 'disc_a', 'disc_b' ], 'fused_disc'
+            )
+
         self.criterion_gan    = GANLoss(config.loss).to(self.device)
         self.criterion_l1     = torch.nn.L1Loss()
-        self.gradient_penalty = config.gradient_penalty
+        self.gradient_penalty = construct_gradient_penalty(
+            config.gradient_penalty
+        )
+        self.fused_disc       = fused_disc
+
+    def _checkpoint_groups(self):
+        result = super()._checkpoint_groups()
+        result[PREFIX_GP] = gradient_penalty_group(self.gradient_penalty)
+
+        return result
 
     def _set_input(self, inputs, domain):
         set_two_domain_input(self.images, inputs, domain, self.device)
 
+    def _inference_graph(self):
+        return {
+            'fake_b' : ('gen_ab', 'real_a'),
+            'fake_a' : ('gen_ba', 'real_b'),
+        }
+
     def forward(self):
         if self.images.real_a is not None:
             self.images.fake_b = self.models.gen_ab(self.images.real_a)
@@ -99,6 +131,19 @@ class Pix2PixModel(ModelBase):
         cond_real = torch.cat([real, preimage], dim = 1)
         cond_fake = torch.cat([fake, preimage], dim = 1).detach()
 
+        if self.fused_disc:
+            pred_real, pred_fake, loss_gp = eval_discriminator_fused(
+                model, cond_real, cond_fake, self.gradient_penalty
+            )
+
+            loss_real = self.criterion_gan(pred_real, True)
+            loss_fake = self.criterion_gan(pred_fake, False)
+
+            loss = (loss_real + loss_fake) * 0.5 + loss_gp
+            loss.backward()
+
+            return loss
+
         pred_real = model(cond_real)
         loss_real = self.criterion_gan(pred_real, True)
 
@@ -108,10 +153,7 @@ class Pix2PixModel(ModelBase):
         loss = (loss_real + loss_fake) * 0.5
 
         if self.gradient_penalty is not None:
-            loss += cal_gradient_penalty(
-                model, cond_real, cond_fake, real.device,
-                **self.gradient_penalty
-            )[0]
+            loss += self.gradient_penalty(model, cond_real, cond_fake)
 
         loss.backward()
         return loss
@@ -151,21 +193,33 @@ class Pix2PixModel(ModelBase):
         )
 
     def optimization_step(self):
-        self.forward()
+        with self.timed('forward'):
+            self.forward()
 
         # Generators
         self.set_requires_grad([self.models.disc_a, self.models.disc_b], False)
         self.optimizers.gen_ab.zero_grad()
         self.optimizers.gen_ba.zero_grad()
-        self.backward_generators()
-        self.optimizers.gen_ab.step()
-        self.optimizers.gen_ba.step()
+
+        with self.timed('backward_gen'):
+            self.backward_generators()
+
+        with self.timed('optimizer_gen'):
+            self.optimizers.gen_ab.step()
+            self.optimizers.gen_ba.step()
 
         # Discriminators
         self.set_requires_grad([self.models.disc_a, self.models.disc_b], True)
         self.optimizers.disc_a.zero_grad()
         self.optimizers.disc_b.zero_grad()
-        self.backward_discriminators()
-        self.optimizers.disc_a.step()
-        self.optimizers.disc_b.step()
+
+        with self.timed('backward_disc'):
+            self.backward_discriminators()
+
+        with self.timed('optimizer_disc'):
+            self.optimizers.disc_a.step()
+            self.optimizers.disc_b.step()
+
+        if self.gradient_penalty is not None:
+            self.gradient_penalty.end_step()
 
@@ -26,7 +26,8 @@ class SimpleAutoencoder(ModelBase):
                 config.generator,
                 config.data.datasets[0].shape,
                 config.data.datasets[0].shape,
-                self.device
+                self.device,
+                skip_init = self.skip_init
             )
         )
 
@@ -46,14 +47,15 @@ class SimpleAutoencoder(ModelBase):
         )
 
     def __init__(
-        self, savedir, config, is_train, device, masking = None
+        self, savedir, config, is_train, device, masking = None,
+        skip_init = False
     ):
         # pylint: disable=too-many-arguments
         self.masking = select_masking(masking)
         assert len(config.data.datasets) == 1, \
             "Simple Autoencoder can work only with a single dataset"
 
-        super().__init__(savedir, config, is_train, device)
+        super().__init__(savedir, config, is_train, device, skip_init)
 
         assert config.discriminator is None, \
             "Autoencoder model does not use discriminator"
@@ -65,6 +67,12 @@ class SimpleAutoencoder(ModelBase):
         else:
             self.images.real = inputs.to(self.device)
 
+    def _inference_graph(self):
+        if self.masking is not None:
+            return None
+
+        return { 'reco' : ('encoder', 'real') }
+
     def forward(self):
         if self.masking is None:
             input_img = self.images.real
@@ -81,13 +89,16 @@ class SimpleAutoencoder(ModelBase):
         self.losses.loss = loss
 
     def optimization_step(self):
-        self.forward()
+        with self.timed('forward'):
+            self.forward()
 
         for optimizer in self.optimizers.values():
             optimizer.zero_grad()
 
-        self.backward()
+        with self.timed('backward'):
+            self.backward()
 
-        for optimizer in self.optimizers.values():
-            optimizer.step()
+        with self.timed('optimizer'):
+            for optimizer in self.optimizers.values():
+                optimizer.step()
 
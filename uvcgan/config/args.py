@@ -21,12 +21,22 @@ class Args:
         'savedir',
         'checkpoint',
         'log_level',
+        'metrics_interval',
+        'async_checkpoint',
+        'checkpoint_retention',
+        'step_log',
+        'profile',
     ]
 
     def __init__(
         self, config, savedir, label,
-        log_level  = 'INFO',
-        checkpoint = 100,
+        log_level            = 'INFO',
+        checkpoint           = 100,
+        metrics_interval     = 50,
+        async_checkpoint     = False,
+        checkpoint_retention = None,
+        step_log             = False,
+        profile              = None,
     ):
         # pylint: disable=too-many-arguments
         self.config     = config
@@ -35,6 +45,13 @@ class Args:
         self.checkpoint = checkpoint
         self.log_level  = log_level
 
+        self.metrics_interval = metrics_interval
+        self.async_checkpoint = async_checkpoint
+
+        self.checkpoint_retention = checkpoint_retention
+        self.step_log             = step_log
+        self.profile              = profile
+
     def __getattr__(self, attr):
         return getattr(self.config, attr)
 
@@ -68,15 +85,24 @@ class Args:
     @staticmethod
     def from_args_dict(
         outdir,
-        label      = None,
-        log_level  = 'INFO',
-        checkpoint = 100,
+        label                = None,
+        log_level            = 'INFO',
+        checkpoint           = 100,
+        metrics_interval     = 50,
+        async_checkpoint     = False,
+        checkpoint_retention = None,
+        step_log             = False,
+        profile              = None,
         **args_dict
     ):
+        # pylint: disable=too-many-arguments
         config  = Config(**args_dict)
         savedir = config.get_savedir(outdir, label)
 
-        result = Args(config, savedir, label, log_level, checkpoint)
+        result = Args(
+            config, savedir, label, log_level, checkpoint, metrics_interval,
+            async_checkpoint, checkpoint_retention, step_log, profile
+        )
         result.check_no_collision()
 
         result.save()
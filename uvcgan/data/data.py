@@ -70,12 +70,17 @@ def construct_single_dataset(dataset_config, split):
 
     return select_dataset(name, path, split, transform, **kwargs)
 
-def construct_datasets(data_config, split):
-    return [
+def construct_datasets(data_config, split, wrap_dataset = None):
+    result = [
         construct_single_dataset(config, split)
             for config in data_config.datasets
     ]
 
+    if wrap_dataset is not None:
+        result = [ wrap_dataset(dataset) for dataset in result ]
+
+    return result
+
 def construct_single_loader(
     dataset, batch_size, shuffle,
     workers         = None,
@@ -85,17 +90,29 @@ def construct_single_loader(
     if workers is None:
         workers = min(torch.get_num_threads(), 20)
 
+    # NOTE: DataLoader rejects `prefetch_factor` without worker processes
+    if workers > 0:
+        kwargs['prefetch_factor'] = prefetch_factor
+
     return torch.utils.data.DataLoader(
         dataset, batch_size,
         shuffle         = shuffle,
         num_workers     = workers,
-        prefetch_factor = prefetch_factor,
         pin_memory      = True,
         **kwargs
     )
 
-def construct_data_loaders(data_config, batch_size, split):
-    datasets = construct_datasets(data_config, split)
+def construct_data_loaders(
+    data_config, batch_size, split,
+    prefetch_factor = 20,
+    wrap_dataset    = None,
+):
+    """Construct data loaders.
+
+    `wrap_dataset` is an optional callable, applied to each of the datasets
+    before constructing the loaders (e.g. for instrumentation).
+    """
+    datasets = construct_datasets(data_config, split, wrap_dataset)
     shuffle  = (split == SPLIT_TRAIN)
 
     if data_config.merge_type == MERGE_PAIRED:
@@ -103,12 +120,13 @@ def construct_data_loaders(data_config, batch_size, split):
 
         return construct_single_loader(
             dataset, batch_size, shuffle, data_config.workers,
-            drop_last = False
+            prefetch_factor, drop_last = False
         )
 
     loaders = [
         construct_single_loader(
             dataset, batch_size, shuffle, data_config.workers,
+            prefetch_factor,
             drop_last = (data_config.merge_type == MERGE_UNPAIRED)
         ) for dataset in datasets
     ]
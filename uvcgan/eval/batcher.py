@@ -0,0 +1,190 @@
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+class BatcherStats:
+    """Thread-safe counters of a `DynamicBatcher`."""
+
+    def __init__(self):
+        self._lock       = threading.Lock()
+        self.requests    = 0
+        self.errors      = 0
+        self.dropped     = 0
+        self.batches     = 0
+        self.batch_sizes = collections.Counter()
+        self.wait_sec    = 0
+        self.compute_sec = 0
+
+    def add_batch(self, size, wait_sec, compute_sec, error = False):
+        with self._lock:
+            self.requests    += size
+            self.batches     += 1
+            self.wait_sec    += wait_sec
+            self.compute_sec += compute_sec
+            self.batch_sizes[size] += 1
+
+            if error:
+                self.errors += size
+
+    def add_dropped(self, n):
+        with self._lock:
+            self.dropped += n
+
+    def values(self):
+        with self._lock:
+            return {
+                'requests'         : self.requests,
+                'errors'           : self.errors,
+                'dropped'          : self.dropped,
+                'batches'          : self.batches,
+                'batch_size_hist'  : dict(sorted(self.batch_sizes.items())),
+                'mean_batch_size'  : self.requests / max(self.batches, 1),
+                'mean_wait_ms'     :
+                    1000 * self.wait_sec / max(self.requests, 1),
+                'mean_compute_ms'  :
+                    1000 * self.compute_sec / max(self.batches, 1),
+            }
+
+class DynamicBatcher:
+    """Coalesce concurrent requests into batches.
+
+    Requests are queued by `submit(x)`, which returns a `Future`. A
+    background thread collects requests until either `max_batch_size` of
+    them are gathered, or the oldest one has waited `max_latency_ms`. Then
+    `fn` is called on the list of the collected inputs, and must return a
+    list of results of the same length. Inputs of different shapes are not
+    batched together.
+    """
+
+    def __init__(
+        self, fn, max_batch_size = 8, max_latency_ms = 10, max_queue = 256
+    ):
+        self._fn          = fn
+        self._max_batch   = max_batch_size
+        self._max_latency = max_latency_ms / 1000
+        self._queue       = queue.Queue(maxsize = max_queue)
+        self._deferred    = collections.deque()
+        self._stats       = BatcherStats()
+        self._stopped     = False
+
+        self._thread = threading.Thread(target = self._run, daemon = True)
+        self._thread.start()
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize() + len(self._deferred)
+
+    def stats(self):
+        result = self._stats.values()
+        result['queue_depth'] = self.queue_depth
+        return result
+
+    def submit(self, x):
+        """Queue `x`. Raises `queue.Full` if the queue is full.
+
+        Requests whose futures are cancelled before their batch is formed
+        (e.g. after a client timeout) are dropped without evaluation.
+        """
+        if self._stopped:
+            raise RuntimeError('Batcher is stopped')
+
+        future = Future()
+        self._queue.put_nowait((x, future, time.perf_counter()))
+
+        return future
+
+    def _next_request(self, timeout):
+        if self._deferred:
+            return self._deferred.popleft()
+
+        return self._queue.get(timeout = timeout)
+
+    def _take_deferred(self, shape, n):
+        result  = []
+        skipped = collections.deque()
+
+        while self._deferred:
+            request = self._deferred.popleft()
+
+            if (len(result) < n) and (request[0].shape == shape):
+                result.append(request)
+            else:
+                skipped.append(request)
+
+        self._deferred = skipped
+        return result
+
+    def _collect_batch(self):
+        try:
+            first = self._next_request(timeout = 0.1)
+        except queue.Empty:
+            return None
+
+        shape    = first[0].shape
+        deadline = first[2] + self._max_latency
+        batch    = [ first ]
+        batch   += self._take_deferred(shape, self._max_batch - 1)
+
+        while len(batch) < self._max_batch:
+            # NOTE: once the deadline has passed, only the requests that
+            #       are already queued are added to the batch.
+            timeout = deadline - time.perf_counter()
+
+            try:
+                if timeout > 0:
+                    request = self._queue.get(timeout = timeout)
+                else:
+                    request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if request[0].shape == shape:
+                batch.append(request)
+            else:
+                self._deferred.append(request)
+
+        return batch
+
+    def _process_batch(self, batch):
+        n     = len(batch)
+        batch = [ r for r in batch if r[1].set_running_or_notify_cancel() ]
+
+        if len(batch) < n:
+            self._stats.add_dropped(n - len(batch))
+
+        if not batch:
+            return
+
+        start  = time.perf_counter()
+        wait   = sum(start - t for (_, _, t) in batch)
+        inputs = [ x for (x, _, _) in batch ]
+
+        try:
+            results = self._fn(inputs)
+        except Exception as e:  # pylint: disable=broad-except
+            for (_, future, _) in batch:
+                future.set_exception(e)
+
+            self._stats.add_batch(
+                len(batch), wait, time.perf_counter() - start, error = True
+            )
+            return
+
+        for ((_, future, _), result) in zip(batch, results):
+            future.set_result(result)
+
+        self._stats.add_batch(len(batch), wait, time.perf_counter() - start)
+
+    def _run(self):
+        while not (self._stopped and self.queue_depth == 0):
+            batch = self._collect_batch()
+
+            if batch:
+                self._process_batch(batch)
+
+    def close(self):
+        """Process the queued requests and stop the batcher thread."""
+        self._stopped = True
+        self._thread.join()
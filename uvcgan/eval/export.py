@@ -0,0 +1,77 @@
+import json
+import logging
+import os
+
+from uvcgan.consts       import MERGE_NONE
+from uvcgan.torch.export import export_module
+
+from .funcs import start_model_eval
+
+LOGGER = logging.getLogger('uvcgan.eval')
+
+def get_network_input_domain(model, name):
+    """Return index of the domain of the real images `name` is applied to.
+
+    Falls back to the first domain for models without inference graphs.
+    """
+    # pylint: disable=protected-access
+    graph = model._inference_graph()
+
+    if graph is not None:
+        for (network, source) in graph.values():
+            if (network == name) and source.startswith('real_'):
+                return ord(source[-1]) - ord('a')
+
+    return 0
+
+def get_export_path(evaldir, name, batch_size, dynamic_batch):
+    if dynamic_batch:
+        fname = f'{name}_dynamic.pt'
+    else:
+        fname = f'{name}_bs{batch_size}.pt'
+
+    return os.path.join(evaldir, 'exported', fname)
+
+def export_generator(
+    path, epoch, name, savepath = None, batch_size = 1,
+    dynamic_batch = False, model_state = 'eval', device = 'cpu'
+):
+    """Export network `name` of the model in `path` as TorchScript graph.
+
+    Returns path to the exported graph and its parity errors (max abs
+    difference) relative to the eager network, for each tested batch size.
+    """
+    # pylint: disable=too-many-arguments
+    args, model, evaldir = start_model_eval(
+        path, epoch, model_state, merge_type = MERGE_NONE,
+        models = [ name ], device = device
+    )
+
+    if epoch == -1:
+        epoch = max(model.find_last_checkpoint_epoch(), 0)
+
+    domain      = get_network_input_domain(model, name)
+    input_shape = args.config.data.datasets[domain].shape
+
+    if savepath is None:
+        savepath = get_export_path(evaldir, name, batch_size, dynamic_batch)
+
+    os.makedirs(os.path.dirname(os.path.abspath(savepath)), exist_ok = True)
+
+    metadata = {
+        'network'     : name,
+        'epoch'       : epoch,
+        'domain'      : domain,
+        'model_state' : model_state,
+        'config'      : json.loads(args.config.to_json()),
+    }
+
+    parity = export_module(
+        model.models[name], input_shape, savepath,
+        batch_size    = batch_size,
+        dynamic_batch = dynamic_batch,
+        metadata      = metadata,
+        device        = device,
+    )
+
+    return (savepath, parity)
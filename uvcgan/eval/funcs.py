@@ -9,6 +9,7 @@ from uvcgan.consts            import (
 from uvcgan.data              import construct_data_loaders
 from uvcgan.torch.funcs       import get_torch_device_smart, seed_everything
 from uvcgan.cgan              import construct_model
+from uvcgan.torch.tiled_inference import TiledInference
 
 def slice_data_loader(loader, batch_size, n_samples = None):
     if n_samples is None:
@@ -54,15 +55,25 @@ def set_model_state(model, state):
     else:
         raise ValueError(f"Unknown model state '{state}'")
 
-def start_model_eval(path, epoch, model_state, merge_type, **config_overrides):
-    args   = Args.load(path)
-    device = get_torch_device_smart()
+def start_model_eval(
+    path, epoch, model_state, merge_type, models = None, outputs = None,
+    device = None, mkdir = True, **config_overrides
+):
+    # pylint: disable=too-many-arguments
+    # NOTE: if `outputs` are specified, only the networks that are needed
+    #       to compute them are loaded. If `mkdir` is False, the returned
+    #       evaldir may not exist.
+    args = Args.load(path)
+
+    if device is None:
+        device = get_torch_device_smart()
 
     override_config(args.config, config_overrides)
     args.config.data.merge_type = merge_type
 
     model = construct_model(
-        args.savedir, args.config, is_train = False, device = device
+        args.savedir, args.config, is_train = False, device = device,
+        skip_init = True
     )
 
     if epoch == -1:
@@ -70,20 +81,24 @@ def start_model_eval(path, epoch, model_state, merge_type, **config_overrides):
 
     print("Load checkpoint at epoch %s" % epoch)
 
+    if (models is None) and (outputs is not None):
+        models = model.required_models(outputs)
+
     seed_everything(args.config.seed)
-    model.load(epoch)
+    model.load(epoch, models = models, mmap = True)
 
     set_model_state(model, model_state)
-    evaldir = get_evaldir(path, epoch, mkdir = True)
+    evaldir = get_evaldir(path, epoch, mkdir = mkdir)
 
     return (args, model, evaldir)
 
 def load_eval_model_dset_from_cmdargs(
-    cmdargs, merge_type = MERGE_NONE, **config_overrides
+    cmdargs, merge_type = MERGE_NONE, outputs = None, device = None,
+    **config_overrides
 ):
     args, model, evaldir = start_model_eval(
         cmdargs.model, cmdargs.epoch, cmdargs.model_state,
-        merge_type = merge_type,
+        merge_type = merge_type, outputs = outputs, device = device,
         batch_size = cmdargs.batch_size, **config_overrides
     )
 
@@ -101,8 +116,17 @@ def get_eval_savedir(evaldir, prefix, model_state, split, mkdir = False):
 
     return result
 
-def make_image_subdirs(model, savedir):
-    for name in model.images:
+def apply_tiled_inference(model, tile_size, **kwargs):
+    """Make all networks of `model` process their inputs tile by tile.
+
+    NOTE: call after the model weights are loaded.
+    """
+    for (name, network) in model.models.items():
+        if network is not None:
+            model.models[name] = TiledInference(network, tile_size, **kwargs)
+
+def make_image_subdirs(model, savedir, outputs = None):
+    for name in (outputs or model.images):
         path = os.path.join(savedir, name)
         os.makedirs(path, exist_ok = True)
 
@@ -0,0 +1,217 @@
+import collections
+import itertools
+
+import torch
+from torch.nn import functional as F
+
+# { label : (output, target) } pairs of images to compare.
+# Translations are labeled by their target domain.
+TRANSLATION_PAIRS = {
+    'a' : ('fake_a', 'real_a'),
+    'b' : ('fake_b', 'real_b'),
+}
+
+RECONSTRUCTION_PAIRS = {
+    'cycle_a' : ('reco_a', 'real_a'),
+    'cycle_b' : ('reco_b', 'real_b'),
+}
+
+def gaussian_window(size, sigma, channels, device = None):
+    # result : (C, 1, size, size)
+    x = torch.arange(size, dtype = torch.float32, device = device)
+    x = torch.exp(-(x - (size - 1) / 2)**2 / (2 * sigma**2))
+    x = x / x.sum()
+
+    window = torch.outer(x, x)
+    return window.expand(channels, 1, size, size).contiguous()
+
+def calc_mae(output, target):
+    # output : (N, C, H, W)
+    # result : (N, )
+    return (output - target).abs().flatten(1).mean(dim = 1)
+
+def calc_psnr(output, target, data_range = 1.0, eps = 1e-10):
+    # result : (N, )
+    mse = (output - target).square().flatten(1).mean(dim = 1)
+    return 10 * torch.log10(data_range**2 / mse.clamp(min = eps))
+
+def calc_ssim(
+    output, target, window, data_range = 1.0, k1 = 0.01, k2 = 0.03
+):
+    """Compute mean SSIM of each image with a gaussian `window`.
+
+    Follows Wang et al. (2004): statistics are computed over the valid
+    (unpadded) windows, and the SSIM map is averaged over channels and
+    pixels.
+    """
+    # pylint: disable=too-many-arguments
+    # output : (N, C, H, W)
+    # window : (C, 1, K, K)
+    window_size = window.shape[-1]
+    height, width = output.shape[-2:]
+
+    if (height < window_size) or (width < window_size):
+        raise ValueError(
+            "SSIM window of size %d does not fit into images of size"
+            " %dx%d" % (window_size, height, width)
+        )
+
+    c1 = (k1 * data_range)**2
+    c2 = (k2 * data_range)**2
+    channels = output.shape[1]
+
+    def filt(x):
+        return F.conv2d(x, window, groups = channels)
+
+    mu_x = filt(output)
+    mu_y = filt(target)
+
+    sigma_xx = filt(output * output) - mu_x**2
+    sigma_yy = filt(target * target) - mu_y**2
+    sigma_xy = filt(output * target) - mu_x * mu_y
+
+    ssim_map = (
+          ((2 * mu_x * mu_y + c1) * (2 * sigma_xy + c2))
+        / ((mu_x**2 + mu_y**2 + c1) * (sigma_xx + sigma_yy + c2))
+    )
+
+    # result : (N, )
+    return ssim_map.flatten(1).mean(dim = 1)
+
+class StreamingImageMetrics:
+    """Running means of per-image MAE, PSNR and SSIM.
+
+    Sums are accumulated on the device of the images, so `update` does not
+    synchronize with the device. Values are transferred only by `values`.
+    """
+
+    def __init__(
+        self, data_range = 1.0, window_size = 11, window_sigma = 1.5
+    ):
+        self._data_range   = data_range
+        self._window_size  = window_size
+        self._window_sigma = window_sigma
+        self._window       = None
+        self._sums         = None
+        self._count        = 0
+
+    def _get_window(self, image):
+        channels = image.shape[1]
+
+        if (
+               (self._window is None)
+            or (self._window.shape[0] != channels)
+            or (self._window.device != image.device)
+        ):
+            self._window = gaussian_window(
+                self._window_size, self._window_sigma, channels, image.device
+            )
+
+        return self._window
+
+    def update(self, output, target):
+        output = output.float()
+        target = target.float()
+
+        # values : (3, N)
+        values = torch.stack([
+            calc_mae(output, target),
+            calc_psnr(output, target, self._data_range),
+            calc_ssim(
+                output, target, self._get_window(output), self._data_range
+            ),
+        ])
+
+        sums = values.sum(dim = 1)
+
+        if self._sums is None:
+            self._sums = sums
+        else:
+            self._sums = self._sums + sums
+
+        self._count += output.shape[0]
+
+    def values(self):
+        if self._count == 0:
+            return {}
+
+        mae, psnr, ssim = (self._sums / self._count).tolist()
+
+        return {
+            'mae'   : mae,
+            'psnr'  : psnr,
+            'ssim'  : ssim,
+            'count' : self._count,
+        }
+
+class DomainMetrics:
+    """Streaming image metrics of `{ label : (output, target) }` pairs."""
+
+    def __init__(self, pairs, **kwargs):
+        self._pairs   = pairs
+        self._metrics = collections.OrderedDict(
+            (label, StreamingImageMetrics(**kwargs)) for label in pairs
+        )
+
+    def update(self, images):
+        """Update metrics with `images` dict (or `NamedDict`)."""
+        for (label, (output, target)) in self._pairs.items():
+            if (output not in images) or (target not in images):
+                continue
+
+            x = images[output]
+            y = images[target]
+
+            if (x is None) or (y is None) or (x.shape != y.shape):
+                continue
+
+            self._metrics[label].update(x, y)
+
+    def summary(self):
+        result = {}
+
+        for (label, metrics) in self._metrics.items():
+            values = metrics.values()
+
+            if values:
+                result[label] = values
+
+        return result
+
+def select_pairs(model, pairs):
+    """Keep only the `pairs` of images that `model` produces."""
+    return {
+        label : (output, target)
+            for (label, (output, target)) in pairs.items()
+            if (output in model.images) and (target in model.images)
+    }
+
+def evaluate_metrics(model, data_it, pairs, n_batches = None, **kwargs):
+    """Compute metrics of `pairs` on batches of a paired loader `data_it`.
+
+    Only the networks needed for the compared outputs are evaluated, and
+    nothing is saved to the disk.
+    """
+    pairs   = select_pairs(model, pairs)
+    outputs = [ output for (output, _target) in pairs.values() ]
+    metrics = DomainMetrics(pairs, **kwargs)
+
+    for batch in itertools.islice(data_it, n_batches):
+        model.set_input(batch)
+        model.infer(outputs)
+        metrics.update(model.images)
+
+    return metrics.summary()
+
+def format_metrics_summary(summary):
+    lines = []
+
+    for (label, values) in summary.items():
+        lines.append(
+            '%-8s mae = %.4e, psnr = %.2f dB, ssim = %.4f (n = %d)' % (
+                label, values['mae'], values['psnr'], values['ssim'],
+                values['count'],
+            )
+        )
+
+    return '\n'.join(lines)
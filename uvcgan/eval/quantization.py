@@ -0,0 +1,187 @@
+import copy
+import itertools
+import logging
+import time
+
+import torch
+
+from uvcgan.torch.quantization import (
+    select_quantized_engine, quantize_transformers_dynamic,
+    list_quantized_modules,
+    StaticConvQuantizer
+)
+
+LOGGER = logging.getLogger('uvcgan.eval')
+
+QUANTIZE_DYNAMIC = 'dynamic'
+QUANTIZE_STATIC  = 'static'
+
+QUANTIZE_MODES = [ QUANTIZE_DYNAMIC, QUANTIZE_STATIC ]
+
+def iterate_domain_batches(data_list, steps):
+    for (domain, loader) in enumerate(data_list):
+        for batch in itertools.islice(loader, steps):
+            yield (domain, batch)
+
+def run_model(model, domain, batch, outputs):
+    model.set_input(batch, domain = domain)
+    return model.infer(outputs)
+
+def calc_errors(reference, images):
+    result = {}
+
+    for (name, ref) in reference.items():
+        image = images[name]
+
+        if (ref is None) or (image is None):
+            continue
+
+        diff = (image.float() - ref.float())
+        result[name] = (
+            diff.abs().sum().item(),
+            diff.abs().max().item(),
+            diff.square().sum().item(),
+            ref.float().square().sum().item(),
+            ref.numel(),
+        )
+
+    return result
+
+def summarize_errors(errors):
+    result = {}
+
+    for (name, values) in errors.items():
+        abs_sum, max_abs, sq_sum, ref_sq_sum, n = zip(*values)
+
+        result[name] = {
+            'mae'     : sum(abs_sum) / sum(n),
+            'max_abs' : max(max_abs),
+            'rel_l2'  : (sum(sq_sum) / max(sum(ref_sq_sum), 1e-12)) ** 0.5,
+        }
+
+    return result
+
+def compare_to_reference(model, reference_models, data_list, outputs, steps):
+    """Compare outputs of the quantized `model` to the fp32 reference."""
+    quantized_models = {
+        name : model.models[name] for name in reference_models
+    }
+    errors = {}
+    times  = { 'fp32' : 0, 'int8' : 0 }
+
+    for (domain, batch) in iterate_domain_batches(data_list, steps):
+        for (name, network) in reference_models.items():
+            model.models[name] = network
+
+        start     = time.perf_counter()
+        reference = run_model(model, domain, batch, outputs)
+        times['fp32'] += time.perf_counter() - start
+
+        for (name, network) in quantized_models.items():
+            model.models[name] = network
+
+        start  = time.perf_counter()
+        images = run_model(model, domain, batch, outputs)
+        times['int8'] += time.perf_counter() - start
+
+        for (name, values) in calc_errors(reference, images).items():
+            errors.setdefault(name, []).append(values)
+
+    return {
+        'errors'   : summarize_errors(errors),
+        'time_sec' : times,
+    }
+
+def quantize_model(
+    model, data_list, outputs = None, mode = QUANTIZE_DYNAMIC,
+    calibration_steps = 4, report_steps = 4
+):
+    """Quantize generators of `model` for CPU inference.
+
+    Linear layers of the transformers, including the attention
+    projections, are always quantized dynamically.
+    If `mode` is 'static', then the UNet conv blocks are also statically
+    quantized, with the quantization ranges calibrated on the first
+    `calibration_steps` batches of each of the `data_list` loaders.
+    Returns accuracy and speed report of the quantized model relative to
+    the fp32 one, evaluated on `report_steps` batches per loader.
+    """
+    # pylint: disable=too-many-arguments
+    if mode not in QUANTIZE_MODES:
+        raise ValueError("Unknown quantization mode: '%s'" % mode)
+
+    if torch.device(model.device).type != 'cpu':
+        raise ValueError("Quantized inference requires model on the CPU")
+
+    if outputs is None:
+        outputs = list(model.images.keys())
+
+    backend  = select_quantized_engine()
+    networks = [
+        name for name in model.required_models(outputs)
+            if model.models[name] is not None
+    ]
+
+    model.eval()
+    reference_models = {
+        name : copy.deepcopy(model.models[name]) for name in networks
+    }
+
+    if mode == QUANTIZE_STATIC:
+        quantizer = StaticConvQuantizer(
+            [ model.models[name] for name in networks ], backend
+        )
+
+        batches = list(iterate_domain_batches(data_list, calibration_steps))
+
+        def run_batches(batches):
+            for (domain, batch) in batches:
+                run_model(model, domain, batch, outputs)
+
+        # NOTE: example inputs of the conv blocks for the FX tracing
+        quantizer.prepare(lambda : run_batches(
+            list(iterate_domain_batches(data_list, 1))
+        ))
+
+        LOGGER.info('Calibrating on %d batches', len(batches))
+        run_batches(batches)
+
+        quantizer.convert()
+
+    for name in networks:
+        n = quantize_transformers_dynamic(model.models[name])
+        LOGGER.info("Quantized %d transformer encoders of '%s'", n, name)
+
+    with torch.inference_mode():
+        result = compare_to_reference(
+            model, reference_models, data_list, outputs, report_steps
+        )
+
+    result['quantized'] = {
+        name : list_quantized_modules(model.models[name])
+            for name in networks
+    }
+
+    return result
+
+def print_quantization_report(report):
+    for (name, modules) in report['quantized'].items():
+        print("Quantized %d modules of '%s':" % (len(modules), name))
+
+        for module in modules:
+            print('    %s' % module)
+
+    print('Quantization accuracy (int8 vs fp32):')
+
+    for (name, values) in report['errors'].items():
+        print(
+            '    %-10s mae = %.4e, max_abs = %.4e, rel_l2 = %.4e' % (
+                name, values['mae'], values['max_abs'], values['rel_l2']
+            )
+        )
+
+    times = report['time_sec']
+    print(
+        'Inference time: fp32 = %.2f s, int8 = %.2f s'
+        % (times['fp32'], times['int8'])
+    )
@@ -0,0 +1,209 @@
+import io
+import json
+import logging
+import os
+import queue
+import socketserver
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import torch
+
+from .batcher import DynamicBatcher
+
+LOGGER = logging.getLogger('uvcgan.eval')
+
+def array_from_bytes(data):
+    with io.BytesIO(data) as f:
+        return np.load(f, allow_pickle = False)
+
+def array_to_bytes(array):
+    with io.BytesIO() as f:
+        np.save(f, array, allow_pickle = False)
+        return f.getvalue()
+
+def construct_translate_fn(network, device):
+    """Return fn translating a list of (H, W, C) or (H, W) images."""
+
+    def translate(images):
+        # x : (N, C, H, W)
+        x = np.stack([
+            (image[..., np.newaxis] if image.ndim == 2 else image)
+                for image in images
+        ]).transpose((0, 3, 1, 2))
+
+        x = torch.from_numpy(np.ascontiguousarray(x, dtype = np.float32))
+
+        with torch.inference_mode():
+            y = network(x.to(device, non_blocking = True))
+
+        # result : (N, H, W, C)
+        result = y.cpu().numpy().transpose((0, 2, 3, 1))
+        return [ np.squeeze(image) for image in result ]
+
+    return translate
+
+class InferenceService:
+    """Translate images with networks of a loaded model.
+
+    Each network gets its own `DynamicBatcher`, so concurrent requests to
+    the same network are evaluated in batches. Networks are evaluated in
+    the state (train or eval) that the `model` is in.
+    """
+
+    def __init__(
+        self, model, networks, max_batch_size = 8, max_latency_ms = 10,
+        max_queue = 256
+    ):
+        # pylint: disable=too-many-arguments
+        self._start    = time.time()
+        self._device   = model.device
+        self._batchers = {}
+
+        for name in networks:
+            self._batchers[name] = DynamicBatcher(
+                construct_translate_fn(model.models[name], model.device),
+                max_batch_size, max_latency_ms, max_queue
+            )
+
+    @property
+    def networks(self):
+        return list(self._batchers.keys())
+
+    def translate(self, name, image, timeout = None):
+        """Translate `image` with network `name`.
+
+        Raises `queue.Full` if the queue of the network is full, and
+        `concurrent.futures.TimeoutError` if the translation is not done
+        within `timeout` seconds. Timed out requests are dropped.
+        """
+        if name not in self._batchers:
+            raise KeyError(name)
+
+        future = self._batchers[name].submit(image)
+
+        try:
+            return future.result(timeout = timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def health(self):
+        return {
+            'status'      : 'ok',
+            'device'      : str(self._device),
+            'networks'    : self.networks,
+            'uptime_sec'  : time.time() - self._start,
+            'queue_depth' : sum(
+                b.queue_depth for b in self._batchers.values()
+            ),
+        }
+
+    def metrics(self):
+        return {
+            name : batcher.stats()
+                for (name, batcher) in self._batchers.items()
+        }
+
+    def close(self):
+        for batcher in self._batchers.values():
+            batcher.close()
+
+class InferenceRequestHandler(BaseHTTPRequestHandler):
+    """HTTP API of the `InferenceService`.
+
+    GET  /health           : service status
+    GET  /metrics          : queue depths and batch size histograms
+    POST /translate/NAME   : translate .npy encoded image with network NAME
+    """
+
+    service         = None
+    request_timeout = None
+
+    def address_string(self):
+        # NOTE: client address is not a tuple for unix sockets
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+
+        return 'unix'
+
+    def log_message(self, format, *args):
+        # pylint: disable=redefined-builtin
+        LOGGER.debug(format, *args)
+
+    def _send(self, code, body, content_type):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, code, value):
+        self._send(code, json.dumps(value).encode(), 'application/json')
+
+    def do_GET(self):
+        # pylint: disable=invalid-name
+        if self.path == '/health':
+            self._send_json(200, self.service.health())
+        elif self.path == '/metrics':
+            self._send_json(200, self.service.metrics())
+        else:
+            self._send_json(404, { 'error' : 'Unknown path: %s' % self.path })
+
+    def do_POST(self):
+        # pylint: disable=invalid-name
+        prefix = '/translate/'
+
+        if not self.path.startswith(prefix):
+            self._send_json(404, { 'error' : 'Unknown path: %s' % self.path })
+            return
+
+        name = self.path[len(prefix):]
+        size = int(self.headers.get('Content-Length', 0))
+
+        try:
+            image  = array_from_bytes(self.rfile.read(size))
+            result = self.service.translate(
+                name, image, self.request_timeout
+            )
+        except KeyError:
+            self._send_json(404, { 'error' : "Unknown network: '%s'" % name })
+        except queue.Full:
+            self._send_json(503, { 'error' : 'Request queue is full' })
+        except FutureTimeoutError:
+            self._send_json(504, { 'error' : 'Request timed out' })
+        except ValueError as e:
+            self._send_json(400, { 'error' : str(e) })
+        except Exception as e:  # pylint: disable=broad-except
+            LOGGER.exception('Translation failed')
+            self._send_json(500, { 'error' : str(e) })
+        else:
+            self._send(200, array_to_bytes(result), 'application/octet-stream')
+
+class ThreadingUnixHTTPServer(
+    socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+        super().server_bind()
+
+def construct_server(
+    service, host = 'localhost', port = 8000, unix = None, timeout = None
+):
+    """Construct HTTP server of `service` on (host, port) or unix socket."""
+    # pylint: disable=too-many-arguments
+    handler = type(
+        'Handler', (InferenceRequestHandler, ),
+        { 'service' : service, 'request_timeout' : timeout }
+    )
+
+    if unix is not None:
+        return ThreadingUnixHTTPServer(unix, handler)
+
+    return ThreadingHTTPServer((host, port), handler)
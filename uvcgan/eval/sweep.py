@@ -0,0 +1,255 @@
+import collections
+import csv
+import itertools
+import logging
+import os
+
+import torch
+
+from uvcgan.cgan.checkpoint import (
+    list_checkpoint_epochs, has_final_checkpoint
+)
+
+from .funcs import (
+    get_evaldir, get_eval_savedir, make_image_subdirs, set_model_state
+)
+from .metrics import DomainMetrics, select_pairs
+from .writer import AsyncImageWriter, CODEC_NPZ
+
+LOGGER = logging.getLogger('uvcgan.eval')
+
+EPOCH_FINAL = 'final'
+
+def parse_epochs(savedir, epochs):
+    """Convert list of epochs specs into a list of epochs.
+
+    A spec is either an epoch number, 'all' (all saved epochs), 'final'
+    (final model, represented by None), or a 'START:END[:STEP]' range.
+    Ranges select only the saved epochs, while missing checkpoints of the
+    explicitly requested epochs raise an error.
+    """
+    available = list_checkpoint_epochs(savedir)
+    result    = []
+
+    for spec in epochs:
+        if spec == 'all':
+            result += available
+        elif spec == EPOCH_FINAL:
+            if not has_final_checkpoint(savedir):
+                raise ValueError(
+                    "Final checkpoint is not found in '%s'" % savedir
+                )
+
+            result.append(None)
+        elif ':' in spec:
+            bounds = [ int(x) for x in spec.split(':') ]
+            result += [ e for e in range(*bounds) if e in available ]
+        else:
+            epoch = int(spec)
+
+            if epoch not in available:
+                raise ValueError(
+                    "Checkpoint of epoch %d is not found in '%s'."
+                    " Available epochs: %s" % (epoch, savedir, available)
+                )
+
+            result.append(epoch)
+
+    return list(dict.fromkeys(result))
+
+def pin_batch(batch):
+    """Pin tensors of a (nested) batch to the page-locked host memory."""
+    if torch.is_tensor(batch):
+        return batch.pin_memory()
+
+    if isinstance(batch, dict):
+        return type(batch)((k, pin_batch(v)) for (k, v) in batch.items())
+
+    if isinstance(batch, (list, tuple)):
+        return type(batch)(pin_batch(x) for x in batch)
+
+    return batch
+
+def cache_batches(data_list, n_batches = None, pin_memory = False):
+    """Load batches of each domain loader once and keep them on host."""
+    result = []
+
+    for loader in data_list:
+        batches = []
+
+        for batch in itertools.islice(loader, n_batches):
+            if pin_memory:
+                batch = pin_batch(batch)
+
+            batches.append(batch)
+
+        result.append(batches)
+
+    return result
+
+def flatten_summary(summary):
+    return {
+        f'{label}_{key}' : value
+            for (label, values) in summary.items()
+            for (key, value) in values.items()
+                if key != 'count'
+    }
+
+def save_images(writer, images, counters, names):
+    for name in names:
+        image = images.get(name)
+
+        if image is None:
+            continue
+
+        writer.write(name, image, counters[name])
+        counters[name] += image.shape[0]
+
+def evaluate_cached(
+    model, cached, outputs, pairs, writer = None, save_outputs = None,
+    data_range = 1.0
+):
+    """Translate `cached` batches and compare outputs to targets.
+
+    If `writer` is not None, images `save_outputs` are saved with it.
+    Batches with the same index in different domains are assumed to be
+    samples of the same objects (only matters for `pairs` comparing
+    translations to the other domain).
+    """
+    # pylint: disable=too-many-arguments
+    metrics  = DomainMetrics(pairs, data_range = data_range)
+    counters = collections.defaultdict(int)
+    n_steps  = max(len(batches) for batches in cached)
+
+    for index in range(n_steps):
+        images = {}
+
+        for (domain, batches) in enumerate(cached):
+            if index >= len(batches):
+                continue
+
+            model.set_input(batches[index], domain = domain)
+            result = model.infer(outputs)
+
+            if writer is not None:
+                save_images(writer, result, counters, save_outputs)
+
+            images.update({
+                k : v for (k, v) in model.images.items() if v is not None
+            })
+
+        metrics.update(images)
+
+    return flatten_summary(metrics.summary())
+
+def get_required_outputs(outputs, pairs):
+    result = list(outputs)
+
+    for (output, _target) in pairs.values():
+        if output not in result:
+            result.append(output)
+
+    return result
+
+def sweep_epochs(
+    model, epochs, cached, outputs, pairs, model_state,
+    savedir_fn = None, codec = CODEC_NPZ, writers = 4,
+    metrics_writer = None, data_range = 1.0
+):
+    """Evaluate `model` at each of `epochs` on the `cached` batches.
+
+    Only the weights of the networks that are needed for `outputs` are
+    loaded for each epoch. If `savedir_fn` is not None, the `outputs` are
+    saved to `savedir_fn(epoch)`. If `metrics_writer` is not None, the
+    metrics of each epoch are written with it as soon as they are computed.
+    Returns a list of per-epoch metrics.
+    """
+    # pylint: disable=too-many-arguments
+    pairs    = select_pairs(model, pairs)
+    required = get_required_outputs(outputs, pairs)
+    networks = model.required_models(required)
+    result   = []
+
+    for epoch in epochs:
+        LOGGER.info('Evaluating epoch %s', epoch)
+        model.load(epoch, models = networks, mmap = True)
+        set_model_state(model, model_state)
+
+        if savedir_fn is None:
+            metrics = evaluate_cached(
+                model, cached, required, pairs, data_range = data_range
+            )
+        else:
+            savedir = savedir_fn(epoch)
+            make_image_subdirs(model, savedir, outputs)
+
+            with AsyncImageWriter(savedir, codec, writers) as writer:
+                metrics = evaluate_cached(
+                    model, cached, required, pairs, writer, outputs,
+                    data_range
+                )
+
+        record = { 'epoch' : epoch, **metrics }
+
+        if metrics_writer is not None:
+            metrics_writer.write(record)
+
+        result.append(record)
+
+    return result
+
+def get_sweep_savedir_fn(root, model_state, split):
+    def savedir_fn(epoch):
+        evaldir = get_evaldir(root, epoch, mkdir = True)
+        return get_eval_savedir(
+            evaldir, 'ndarrays', model_state, split, mkdir = True
+        )
+
+    return savedir_fn
+
+class SweepMetricsWriter:
+    """Append per-epoch metrics records to a CSV file.
+
+    The columns are taken from the first record. Each row is flushed to
+    the disk when written, so the metrics of the finished epochs survive
+    an interrupted sweep.
+    """
+
+    def __init__(self, path):
+        self._path   = path
+        self._file   = None
+        self._writer = None
+
+    def write(self, record):
+        if self._writer is None:
+            # pylint: disable=consider-using-with
+            self._file = open(
+                self._path, 'wt', newline = '', encoding = 'utf-8'
+            )
+            self._writer = csv.DictWriter(
+                self._file, fieldnames = list(record), restval = '',
+                extrasaction = 'ignore'
+            )
+            self._writer.writeheader()
+
+        self._writer.writerow({
+            k : (EPOCH_FINAL if (k == 'epoch' and v is None) else v)
+                for (k, v) in record.items()
+        })
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+        self._file   = None
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def get_sweep_metrics_path(root, model_state, split):
+    return os.path.join(root, 'evals', f'sweep_{model_state}-{split}.csv')
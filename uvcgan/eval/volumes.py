@@ -0,0 +1,233 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+from torch.nn import functional as F
+
+LOGGER = logging.getLogger('uvcgan.eval')
+
+EXT_NPY    = '.npy'
+EXT_NPZ    = '.npz'
+EXT_NIFTI  = ( '.nii', '.nii.gz' )
+EXTENSIONS = ( EXT_NPY, EXT_NPZ, *EXT_NIFTI )
+
+def find_volumes(paths):
+    result = []
+
+    for path in paths:
+        if not os.path.isdir(path):
+            result.append(path)
+            continue
+
+        result += sorted(
+            os.path.join(path, fname) for fname in os.listdir(path)
+                if fname.endswith(EXTENSIONS)
+        )
+
+    return result
+
+def import_nibabel():
+    try:
+        # pylint: disable=import-outside-toplevel
+        import nibabel
+    except ImportError as e:
+        raise ImportError(
+            'Reading NIfTI volumes requires `nibabel` package'
+        ) from e
+
+    return nibabel
+
+def load_volume(path):
+    """Load volume and its metadata from `path`.
+
+    For .npz archives, the volume is the first array, and the other arrays
+    (e.g. voxel spacing) are kept as metadata. For NIfTI files, the affine
+    and the header are kept.
+    """
+    if path.endswith(EXT_NPZ):
+        with np.load(path) as f:
+            arrays = { k : f[k] for k in f.files }
+
+        key = list(arrays.keys())[0]
+        return (arrays.pop(key), { 'key' : key, 'extra' : arrays })
+
+    if path.endswith(EXT_NPY):
+        return (np.load(path), {})
+
+    if path.endswith(EXT_NIFTI):
+        image = import_nibabel().load(path)
+        return (
+            np.asanyarray(image.dataobj),
+            { 'affine' : image.affine, 'header' : image.header }
+        )
+
+    raise ValueError("Unknown volume format: '%s'" % path)
+
+def save_volume(path, volume, metadata):
+    """Save `volume` in the format of `path` with the `metadata`."""
+    if path.endswith(EXT_NPZ):
+        arrays = { metadata.get('key', 'arr_0') : volume }
+        arrays.update(metadata.get('extra', {}))
+        np.savez_compressed(path, **arrays)
+
+    elif path.endswith(EXT_NPY):
+        np.save(path, volume)
+
+    elif path.endswith(EXT_NIFTI):
+        nibabel = import_nibabel()
+        header  = metadata['header'].copy()
+        header.set_data_dtype(volume.dtype)
+
+        # NOTE: loaded volumes are already scaled by scl_slope/scl_inter.
+        #       Keeping them in the header would scale the output again.
+        header.set_slope_inter(None, None)
+
+        nibabel.save(
+            nibabel.Nifti1Image(volume, metadata['affine'], header), path
+        )
+
+    else:
+        raise ValueError("Unknown volume format: '%s'" % path)
+
+def volume_to_slices(volume, axis):
+    """Convert volume into a (D, C, H, W) stack of slices along `axis`.
+
+    `volume` is either (X, Y, Z) array, or (X, Y, Z, C) multichannel one.
+    """
+    result = np.moveaxis(volume, axis, 0)
+
+    if result.ndim == 3:
+        # result : (D, H, W) -> (D, 1, H, W)
+        return result[:, np.newaxis]
+
+    # result : (D, H, W, C) -> (D, C, H, W)
+    return result.transpose((0, 3, 1, 2))
+
+def slices_to_volume(slices, axis, ndim):
+    """Inverse of `volume_to_slices`."""
+    if ndim == 3:
+        # slices : (D, 1, H, W) -> (D, H, W)
+        result = slices[:, 0]
+    else:
+        # slices : (D, C, H, W) -> (D, H, W, C)
+        result = slices.transpose((0, 2, 3, 1))
+
+    return np.moveaxis(result, 0, axis)
+
+def translate_slices(
+    network, slices, batch_size, device, shape = None, scale = 1, shift = 0
+):
+    """Translate (D, C, H, W) `slices` with `network` in batches.
+
+    Slices are normalized as `x / scale + shift`. If `shape` is not None,
+    they are resized to `shape` before the translation, and the results are
+    resized back. The order of the slices is preserved.
+    """
+    # pylint: disable=too-many-arguments
+    result = []
+    size   = slices.shape[2:]
+
+    for index in range(0, len(slices), batch_size):
+        x = torch.from_numpy(
+            np.ascontiguousarray(slices[index:index + batch_size])
+        )
+        x = x.to(device, dtype = torch.float32, non_blocking = True)
+        x = x / scale + shift
+
+        if (shape is not None) and (tuple(shape) != tuple(size)):
+            x = F.interpolate(x, size = tuple(shape), mode = 'bilinear')
+            y = network(x)
+            y = F.interpolate(y, size = tuple(size), mode = 'bilinear')
+        else:
+            y = network(x)
+
+        y = (y - shift) * scale
+        result.append(y.cpu().numpy())
+
+    return np.concatenate(result, axis = 0)
+
+class VolumePrefetcher:
+    """Iterate over `(path, volume, metadata)`, loading volumes ahead.
+
+    Up to `depth` next volumes are loaded in a background thread while the
+    current one is processed.
+    """
+
+    def __init__(self, paths, depth = 1):
+        self._paths    = paths
+        self._depth    = depth
+        self._executor = ThreadPoolExecutor(max_workers = 1)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __iter__(self):
+        pending = [
+            (path, self._executor.submit(load_volume, path))
+                for path in self._paths[:self._depth]
+        ]
+        index = len(pending)
+
+        while pending:
+            path, future = pending.pop(0)
+
+            if index < len(self._paths):
+                next_path = self._paths[index]
+                pending.append(
+                    (next_path, self._executor.submit(load_volume, next_path))
+                )
+                index += 1
+
+            volume, metadata = future.result()
+            yield (path, volume, metadata)
+
+    def close(self):
+        self._executor.shutdown(wait = True)
+
+def translate_volumes(
+    network, paths, outdir, axis = 0, batch_size = 16, device = 'cpu',
+    shape = None, scale = 1, shift = 0, progress = None
+):
+    """Translate volumes in `paths` slice by slice and save to `outdir`.
+
+    Loading of the next volume and saving of the previous one overlap with
+    the translation of the current one. At most one volume is being saved
+    at a time, so the translated volumes do not pile up in memory when the
+    disk is slower than the translation. Outputs keep the names, formats
+    and metadata of the inputs.
+    """
+    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-locals
+    os.makedirs(outdir, exist_ok = True)
+
+    prefetcher = VolumePrefetcher(paths)
+    saver      = ThreadPoolExecutor(max_workers = 1)
+    saving     = None
+    volumes_it = prefetcher if progress is None else progress(prefetcher)
+
+    try:
+        for (path, volume, metadata) in volumes_it:
+            slices = volume_to_slices(volume, axis)
+
+            with torch.inference_mode():
+                result = translate_slices(
+                    network, slices, batch_size, device, shape, scale, shift
+                )
+
+            result   = slices_to_volume(result, axis, volume.ndim)
+            savepath = os.path.join(outdir, os.path.basename(path))
+
+            if saving is not None:
+                saving.result()
+
+            saving = saver.submit(save_volume, savepath, result, metadata)
+            LOGGER.debug("Translated '%s' -> '%s'", path, savepath)
+
+        if saving is not None:
+            saving.result()
+
+    finally:
+        prefetcher.close()
+        saver.shutdown(wait = True)
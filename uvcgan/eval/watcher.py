@@ -0,0 +1,282 @@
+import collections
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import torch
+from torchvision.datasets.folder import default_loader, IMG_EXTENSIONS
+
+from uvcgan.data.datasets.ndarray_domain_hierarchy import load_ndarray
+from uvcgan.data.transforms import select_transform
+
+from .export import get_network_input_domain
+from .writer import select_codec, batch_to_images, CODEC_NPZ
+
+LOGGER = logging.getLogger('uvcgan.eval')
+
+NDARRAY_EXTENSIONS = ( '.npz', )
+RECORD_FNAME       = 'processed.jsonl'
+
+def load_frame(path, transform):
+    if path.endswith(NDARRAY_EXTENSIONS):
+        image = np.float32(load_ndarray(path))
+    else:
+        image = default_loader(path)
+
+    return transform(image)
+
+class ProcessedRecord:
+    """Persistent record of processed files.
+
+    Records are appended to a JSON lines file, so the record survives
+    restarts and grows with the number of processed files only.
+    """
+
+    def __init__(self, path):
+        self._path  = path
+        self._names = set()
+
+        if os.path.exists(path):
+            with open(path, 'rt', encoding = 'utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        self._names.add(json.loads(line)['name'])
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, names):
+        with open(self._path, 'at', encoding = 'utf-8') as f:
+            for name in names:
+                f.write(json.dumps({ 'name' : name, 'time' : time.time() }))
+                f.write('\n')
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._names.update(names)
+
+class DirectoryWatcher:
+    """Poll `path` for new files that are not in the `record`.
+
+    A file is reported once its size and modification time have not changed
+    for `settle_sec`, so that partially written files are skipped.
+    """
+
+    def __init__(self, path, record, settle_sec = 1.0, extensions = None):
+        if extensions is None:
+            extensions = tuple(IMG_EXTENSIONS) + NDARRAY_EXTENSIONS
+
+        self._path       = path
+        self._record     = record
+        self._settle_sec = settle_sec
+        self._extensions = tuple(extensions)
+        self._candidates = {}
+
+    def poll(self):
+        """Return new settled files sorted by modification time."""
+        result = []
+        now    = time.time()
+
+        with os.scandir(self._path) as it:
+            entries = [
+                e for e in it
+                    if e.is_file()
+                    and e.name.lower().endswith(self._extensions)
+                    and (e.name not in self._record)
+            ]
+
+        names = { e.name for e in entries }
+        self._candidates = {
+            k : v for (k, v) in self._candidates.items() if k in names
+        }
+
+        for entry in entries:
+            stat  = entry.stat()
+            state = (stat.st_size, stat.st_mtime)
+
+            prev_state, since = self._candidates.get(entry.name, (None, now))
+
+            if state != prev_state:
+                self._candidates[entry.name] = (state, now)
+                continue
+
+            if now - since >= self._settle_sec:
+                result.append((stat.st_mtime, entry.name))
+
+        result.sort()
+        return [ name for (_, name) in result ]
+
+    @property
+    def n_candidates(self):
+        """Number of new files that have not settled yet."""
+        return len(self._candidates)
+
+    def mark_processed(self, names):
+        self._record.add(names)
+
+        for name in names:
+            self._candidates.pop(name, None)
+
+class StreamingTranslator:
+    """Translate files arriving in `indir` and save results to `outdir`.
+
+    New files are collected into batches of up to `batch_size`. A batch is
+    translated once it is full, or once its first file has waited for
+    `max_latency_sec`. Images of different shapes in a batch are
+    translated separately. Processed files are recorded in `outdir`, so the
+    translation resumes where it stopped after a restart.
+    """
+
+    def __init__(
+        self, network, indir, outdir, transform, device,
+        batch_size      = 16,
+        max_latency_sec = 1.0,
+        settle_sec      = 1.0,
+        codec           = CODEC_NPZ,
+    ):
+        # pylint: disable=too-many-arguments
+        os.makedirs(outdir, exist_ok = True)
+
+        self._network   = network
+        self._indir     = indir
+        self._outdir    = outdir
+        self._transform = transform
+        self._device    = device
+        self._save_fn   = select_codec(codec)
+
+        self._batch_size  = batch_size
+        self._max_latency = max_latency_sec
+
+        self._record  = ProcessedRecord(os.path.join(outdir, RECORD_FNAME))
+        self._watcher = DirectoryWatcher(indir, self._record, settle_sec)
+        # pending : list of (name, arrival time)
+        self._pending = []
+
+        LOGGER.info(
+            'Found %d previously processed files', len(self._record)
+        )
+
+    def _load_frames(self, names):
+        frames = []
+        loaded = []
+
+        for name in names:
+            path = os.path.join(self._indir, name)
+
+            try:
+                frames.append(load_frame(path, self._transform))
+                loaded.append(name)
+            except Exception:  # pylint: disable=broad-except
+                # NOTE: unreadable files are recorded as processed, so that
+                #       they are not retried forever.
+                LOGGER.exception("Failed to load '%s'. Skipping.", path)
+
+        return (frames, loaded)
+
+    def _translate_group(self, names, frames):
+        # x : (N, C, H, W)
+        x = torch.stack(frames).to(self._device, non_blocking = True)
+
+        with torch.inference_mode():
+            y = self._network(x)
+
+        # NOTE: output names keep the source extension, so that inputs that
+        #       share a stem (e.g. `a.png` and `a.npz`) do not collide.
+        for (name, image) in zip(names, batch_to_images(y)):
+            self._save_fn(os.path.join(self._outdir, name), np.squeeze(image))
+
+    def _translate(self, names):
+        frames, loaded = self._load_frames(names)
+
+        # groups : { shape : [ (name, frame), ... ] }
+        groups = collections.defaultdict(list)
+
+        for (name, frame) in zip(loaded, frames):
+            groups[tuple(frame.shape)].append((name, frame))
+
+        for group in groups.values():
+            group_names = [ name for (name, _) in group ]
+
+            try:
+                self._translate_group(
+                    group_names, [ frame for (_, frame) in group ]
+                )
+            except Exception:  # pylint: disable=broad-except
+                # NOTE: like unreadable files, files that fail to translate
+                #       are recorded as processed, to not retry them forever.
+                LOGGER.exception(
+                    'Failed to translate %s. Skipping.', group_names
+                )
+
+        self._watcher.mark_processed(names)
+
+    def step(self, flush = False):
+        """Poll for new files and translate ready batches.
+
+        Returns the number of translated files.
+        """
+        now     = time.monotonic()
+        pending = { name for (name, _) in self._pending }
+
+        for name in self._watcher.poll():
+            if name not in pending:
+                self._pending.append((name, now))
+
+        result = 0
+
+        while self._pending:
+            timed_out = (
+                time.monotonic() - self._pending[0][1] >= self._max_latency
+            )
+
+            if (
+                    (len(self._pending) < self._batch_size)
+                and not (flush or timed_out)
+            ):
+                break
+
+            batch         = self._pending[:self._batch_size]
+            self._pending = self._pending[self._batch_size:]
+
+            self._translate([ name for (name, _) in batch ])
+            result += len(batch)
+
+        return result
+
+    def run(self, poll_interval = 0.5, once = False):
+        """Translate files until interrupted.
+
+        If `once`, translate the files that are present and return.
+        """
+        total = 0
+
+        while True:
+            n = self.step(flush = once)
+            total += n
+
+            if n > 0:
+                LOGGER.info('Translated %d files (%d total)', n, total)
+
+            if once and not (self._pending or self._watcher.n_candidates):
+                return total
+
+            time.sleep(poll_interval)
+
+def construct_streaming_translator(
+    model, config, network, indir, outdir, **kwargs
+):
+    # pylint: disable=too-many-arguments
+    domain    = get_network_input_domain(model, network)
+    transform = select_transform(config.data.datasets[domain].transform_test)
+
+    return StreamingTranslator(
+        model.models[network], indir, outdir, transform, model.device,
+        **kwargs
+    )
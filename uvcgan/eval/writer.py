@@ -0,0 +1,103 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+CODEC_NPZ = 'npz'
+CODEC_NPY = 'npy'
+CODEC_PNG = 'png'
+
+CODECS = [ CODEC_NPZ, CODEC_NPY, CODEC_PNG ]
+
+def save_npz(path, image):
+    np.savez_compressed(path + '.npz', image)
+
+def save_npy(path, image):
+    np.save(path + '.npy', image)
+
+def save_png(path, image):
+    # NOTE: png stores 8-bit images. Values are clipped to [0, 1] range.
+    image = np.round(255 * np.clip(image, 0, 1)).astype(np.uint8)
+    Image.fromarray(image).save(path + '.png')
+
+def select_codec(codec):
+    if codec == CODEC_NPZ:
+        return save_npz
+
+    if codec == CODEC_NPY:
+        return save_npy
+
+    if codec == CODEC_PNG:
+        return save_png
+
+    raise ValueError("Unknown output codec: '%s'" % codec)
+
+def batch_to_images(batch):
+    # batch : (N, C, H, W)
+    # result : (N, H, W, C)
+    result = batch.detach().cpu().numpy()
+    return result.transpose((0, 2, 3, 1))
+
+class AsyncImageWriter:
+    """Save batches of images with a pool of background writers.
+
+    Each batch is copied to the host in a single transfer, and its images
+    are encoded and saved by `workers` threads. At most `max_pending`
+    batches are queued: `write` blocks when the queue is full. Images are
+    saved as `savedir/NAME/sample_INDEX.EXT`.
+    """
+
+    def __init__(
+        self, savedir, codec = CODEC_NPZ, workers = 4, max_pending = 16
+    ):
+        self._savedir  = savedir
+        self._save_fn  = select_codec(codec)
+        self._executor = ThreadPoolExecutor(max_workers = workers)
+        self._slots    = threading.BoundedSemaphore(max_pending)
+        self._futures  = []
+
+    def _save_images(self, name, images, start_index):
+        try:
+            for (index, image) in enumerate(images):
+                path = os.path.join(
+                    self._savedir, name, f'sample_{start_index + index}'
+                )
+                self._save_fn(path, np.squeeze(image))
+        finally:
+            self._slots.release()
+
+    def _check_errors(self, wait = False):
+        pending = []
+
+        for future in self._futures:
+            if wait or future.done():
+                future.result()
+            else:
+                pending.append(future)
+
+        self._futures = pending
+
+    def write(self, name, batch, start_index):
+        """Save `batch` of images as samples starting from `start_index`."""
+        self._check_errors()
+
+        images = batch_to_images(batch)
+
+        self._slots.acquire()
+        self._futures.append(self._executor.submit(
+            self._save_images, name, images, start_index
+        ))
+
+    def close(self):
+        try:
+            self._check_errors(wait = True)
+        finally:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
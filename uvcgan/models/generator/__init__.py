@@ -1,6 +1,6 @@
 from uvcgan.base.networks    import select_base_generator
 from uvcgan.base.weight_init import init_weights
-from uvcgan.torch.funcs      import prepare_model
+from uvcgan.torch.funcs      import construct_module, prepare_model
 
 from .vit       import ViTGenerator
 from .vitunet   import ViTUNetGenerator
@@ -18,16 +18,22 @@ def select_generator(name, **kwargs):
     assert input_shape == output_shape
     return select_base_generator(name, image_shape = input_shape, **kwargs)
 
-def construct_generator(model_config, input_shape, output_shape, device):
-    model = select_generator(
+def construct_generator(
+    model_config, input_shape, output_shape, device, skip_init = False
+):
+    model = construct_module(
+        select_generator,
         model_config.model,
         input_shape  = input_shape,
         output_shape = output_shape,
+        skip_init    = skip_init,
         **model_config.model_args
     )
 
     model = prepare_model(model, device)
-    init_weights(model, model_config.weight_init)
+
+    if not skip_init:
+        init_weights(model, model_config.weight_init)
 
     return model
 
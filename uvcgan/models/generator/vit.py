@@ -14,7 +14,8 @@ class ViTGenerator(nn.Module):
     def __init__(
         self, features, n_heads, n_blocks, ffn_features, embed_features,
         activ, norm, input_shape, output_shape, token_size,
-        rescale = False, rezero = True, **kwargs
+        rescale = False, rezero = True, grad_checkpoint = False,
+        attention = 'mha', **kwargs
     ):
         super().__init__(**kwargs)
 
@@ -33,7 +34,8 @@ class ViTGenerator(nn.Module):
         )
 
         self.trans = TransformerEncoder(
-            features, ffn_features, n_heads, n_blocks, activ, norm, rezero
+            features, ffn_features, n_heads, n_blocks, activ, norm, rezero,
+            grad_checkpoint, attention
         )
 
         self.gan_output = nn.Linear(features, self.token_features)
@@ -13,11 +13,14 @@ class ViTUNetGenerator(nn.Module):
         self, features, n_heads, n_blocks, ffn_features, embed_features,
         activ, norm, input_shape, output_shape,
         unet_features_list, unet_activ, unet_norm,
-        unet_downsample = 'conv',
-        unet_upsample   = 'upsample-conv',
-        unet_rezero     = False,
-        rezero          = True,
-        activ_output    = None,
+        unet_downsample      = 'conv',
+        unet_upsample        = 'upsample-conv',
+        unet_rezero          = False,
+        unet_grad_checkpoint = False,
+        rezero               = True,
+        activ_output         = None,
+        grad_checkpoint      = False,
+        attention            = 'mha',
         **kwargs
     ):
         # pylint: disable = too-many-locals
@@ -30,14 +33,17 @@ class ViTUNetGenerator(nn.Module):
 
         self.net = UNet(
             unet_features_list, unet_activ, unet_norm, image_shape,
-            unet_downsample, unet_upsample, unet_rezero
+            unet_downsample, unet_upsample, unet_rezero,
+            unet_grad_checkpoint
         )
 
         bottleneck = PixelwiseViT(
             features, n_heads, n_blocks, ffn_features, embed_features,
             activ, norm,
-            image_shape = self.net.get_inner_shape(),
-            rezero      = rezero
+            image_shape     = self.net.get_inner_shape(),
+            rezero          = rezero,
+            grad_checkpoint = grad_checkpoint,
+            attention       = attention,
         )
 
         self.net.set_bottleneck(bottleneck)
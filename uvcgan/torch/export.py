@@ -0,0 +1,99 @@
+import json
+import logging
+
+import torch
+
+LOGGER = logging.getLogger('uvcgan.torch')
+
+EXPORT_METADATA = 'uvcgan_metadata.json'
+
+def trace_module(module, example_input, check_input = None, freeze = True):
+    """Trace `module` into a TorchScript graph in its current state.
+
+    If `check_input` is not None, the module is re-traced on it, and an
+    error is raised if the graph depends on the input shape (e.g. batch
+    size is baked into the graph). Only graphs of modules in the eval
+    state can be frozen.
+    """
+    check_inputs = None
+
+    if freeze and module.training:
+        LOGGER.warning(
+            'Module is in the train state. Exporting it without freezing.'
+        )
+        freeze = False
+
+    if check_input is not None:
+        check_inputs = [ (example_input, ), (check_input, ) ]
+
+    with torch.no_grad():
+        result = torch.jit.trace(
+            module, example_input, check_inputs = check_inputs
+        )
+
+    if freeze:
+        result = torch.jit.freeze(result)
+
+    return result
+
+def save_exported(module, path, metadata):
+    extra_files = { EXPORT_METADATA : json.dumps(metadata, indent = 4) }
+    torch.jit.save(module, path, _extra_files = extra_files)
+
+def load_exported(path, device = 'cpu'):
+    """Load exported graph and its metadata. Does not require uvcgan."""
+    extra_files = { EXPORT_METADATA : '' }
+    module = torch.jit.load(
+        path, map_location = device, _extra_files = extra_files
+    )
+
+    return (module, json.loads(extra_files[EXPORT_METADATA]))
+
+def check_parity(eager, exported, x):
+    """Return max absolute difference between `eager` and `exported`."""
+    with torch.no_grad():
+        y_eager    = eager(x)
+        y_exported = exported(x)
+
+    return (y_exported.float() - y_eager.float()).abs().max().item()
+
+def export_module(
+    module, input_shape, path, batch_size = 1, dynamic_batch = False,
+    metadata = None, device = 'cpu', freeze = True
+):
+    """Export `module` acting on `input_shape` images to `path`.
+
+    The graph is traced on a batch of `batch_size` images. If
+    `dynamic_batch`, it is also checked on a batch of a different size.
+    Returns parity errors of the exported graph relative to `module`.
+    """
+    # pylint: disable=too-many-arguments
+    # x : (N, C, H, W)
+    x = torch.randn((batch_size, *input_shape), device = device)
+    check_input = None
+    parity      = {}
+
+    if dynamic_batch:
+        check_input = torch.randn(
+            (batch_size + 1, *input_shape), device = device
+        )
+
+    exported = trace_module(module, x, check_input, freeze)
+
+    metadata = dict(metadata or {})
+    metadata.update({
+        'input_shape'   : list(input_shape),
+        'batch_size'    : (None if dynamic_batch else batch_size),
+        'torch_version' : torch.__version__,
+    })
+
+    save_exported(exported, path, metadata)
+    LOGGER.info("Exported graph saved to '%s'", path)
+
+    exported, _ = load_exported(path, device)
+    parity[batch_size] = check_parity(module, exported, x)
+
+    if check_input is not None:
+        parity[batch_size + 1] = check_parity(module, exported, check_input)
+
+    return parity
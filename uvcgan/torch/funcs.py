@@ -1,12 +1,22 @@
+import inspect
+import itertools
 import logging
 import random
 import torch
+import torch.utils.checkpoint
 import numpy as np
 
 from torch import nn
 
 LOGGER = logging.getLogger('uvcgan.torch')
 
+CHECKPOINT_KWARGS = {}
+
+if 'use_reentrant' in inspect.signature(
+    torch.utils.checkpoint.checkpoint
+).parameters:
+    CHECKPOINT_KWARGS['use_reentrant'] = False
+
 def seed_everything(seed):
     torch.manual_seed(seed)
     random.seed(seed)
@@ -18,8 +28,32 @@ def get_torch_device_smart():
 
     return 'cpu'
 
+def construct_module(fn, *args, skip_init = False, **kwargs):
+    """Call module constructor `fn`.
+
+    If `skip_init` is True, then the module is constructed on the meta
+    device, i.e. without allocating and initializing its parameters. Such a
+    module gets storage from `prepare_model`, and its values must be loaded
+    from a checkpoint. Requires torch >= 2.0, otherwise the module is
+    constructed normally.
+    """
+    if skip_init and hasattr(torch.device, '__enter__'):
+        with torch.device('meta'):
+            return fn(*args, **kwargs)
+
+    return fn(*args, **kwargs)
+
+def is_meta_module(model):
+    return any(
+        x.device.type == 'meta'
+            for x in itertools.chain(model.parameters(), model.buffers())
+    )
+
 def prepare_model(model, device):
-    model = model.to(device)
+    if is_meta_module(model):
+        model = model.to_empty(device = device)
+    else:
+        model = model.to(device)
 
     if torch.cuda.device_count() > 1:
         LOGGER.warning(
@@ -30,3 +64,14 @@ def prepare_model(model, device):
 
     return model
 
+
+def call_with_checkpoint(fn, *args):
+    """Call `fn` without storing its intermediate activations.
+
+    The activations are recomputed during the backward pass instead. If
+    gradients are disabled, then `fn` is called directly.
+    """
+    if not torch.is_grad_enabled():
+        return fn(*args)
+
+    return torch.utils.checkpoint.checkpoint(fn, *args, **CHECKPOINT_KWARGS)
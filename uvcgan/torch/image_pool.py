@@ -0,0 +1,121 @@
+import torch
+
+class TensorImagePool:
+    """Image pool backed by a preallocated tensor.
+
+    This pool is a drop-in replacement of the `uvcgan.base.ImagePool`. The
+    pool keeps generated images in a preallocated tensor of shape
+    `(pool_size, *image_shape)`, and makes the swap/return decision for the
+    whole batch at once.
+
+    While the pool is not full, incoming images are inserted into the pool
+    and returned as is. Once the pool is full, each incoming image is either
+    returned as is (with probability 50%), or swapped with a randomly chosen
+    image from the pool, in which case the pooled image is returned.
+
+    Parameters
+    ----------
+    pool_size : int
+        Size of the pool. If `pool_size` is 0, then no pool is created, and
+        `query` returns its inputs.
+    image_shape : tuple of int
+        Shape of the pooled images (C, H, W).
+    device : str or torch.device
+        Device to keep the pool at.
+    pin_memory : bool
+        If True, keep the pool in the pinned host memory instead of `device`.
+        Default: False.
+    """
+
+    def __init__(self, pool_size, image_shape, device, pin_memory = False):
+        self.pool_size = pool_size
+        self.num_imgs  = 0
+        self.images    = None
+
+        if pool_size <= 0:
+            return
+
+        shape = (pool_size, *image_shape)
+
+        if pin_memory:
+            self.images = torch.empty(shape, device = 'cpu')
+
+            if torch.cuda.is_available():
+                self.images = self.images.pin_memory()
+        else:
+            self.images = torch.empty(shape, device = device)
+
+    def _select_swap_indices(self, n):
+        # result : (positions in batch, positions in pool)
+        swap   = (torch.rand(n) > 0.5)
+        n_swap = int(swap.sum())
+
+        batch_index = swap.nonzero().squeeze(1)
+
+        if n_swap <= self.pool_size:
+            pool_index = torch.randperm(self.pool_size)[:n_swap]
+        else:
+            pool_index = torch.randint(0, self.pool_size, (n_swap, ))
+
+        return (batch_index, pool_index)
+
+    def _insert(self, images):
+        n_insert = min(self.pool_size - self.num_imgs, images.shape[0])
+
+        if n_insert > 0:
+            self.images[self.num_imgs:self.num_imgs + n_insert].copy_(
+                images[:n_insert]
+            )
+            self.num_imgs += n_insert
+
+        return n_insert
+
+    def query(self, images):
+        # images : (N, C, H, W)
+        if self.pool_size == 0:
+            return images
+
+        images   = images.detach()
+        n_insert = self._insert(images)
+
+        if n_insert == images.shape[0]:
+            return images
+
+        rest = images[n_insert:]
+        batch_index, pool_index = self._select_swap_indices(rest.shape[0])
+
+        if len(batch_index) == 0:
+            return images
+
+        pool_device = self.images.device
+        pool_index  = pool_index.to(pool_device)
+        batch_index = batch_index.to(images.device)
+
+        pooled = self.images.index_select(0, pool_index)
+        pooled = pooled.to(images.device, non_blocking = True)
+
+        self.images.index_copy_(
+            0, pool_index, rest.index_select(0, batch_index).to(pool_device)
+        )
+
+        result = rest.index_copy(0, batch_index, pooled)
+
+        if n_insert == 0:
+            return result
+
+        return torch.cat([ images[:n_insert], result ], dim = 0)
+
+    def state_dict(self):
+        if self.images is None:
+            return { 'num_imgs' : 0, 'images' : None }
+
+        return {
+            'num_imgs' : self.num_imgs,
+            'images'   : self.images[:self.num_imgs].to('cpu'),
+        }
+
+    def load_state_dict(self, state_dict):
+        self.num_imgs = state_dict['num_imgs']
+
+        if self.num_imgs > 0:
+            self.images[:self.num_imgs].copy_(state_dict['images'])
@@ -3,8 +3,12 @@
 
 import torch
 from torch import nn
+from torch.nn import functional as F
 
-from uvcgan.torch.select import get_norm_layer, get_activ_layer
+from uvcgan.torch.funcs  import call_with_checkpoint
+from uvcgan.torch.select import (
+    get_norm_layer, get_activ_layer, extract_name_kwargs
+)
 
 def calc_tokenized_size(image_shape, token_size):
     # image_shape : (C, H, W)
@@ -76,16 +80,104 @@ class PositionWiseFFN(nn.Module):
     def forward(self, x):
         return self.net(x)
 
+def scaled_dot_product_attention(query, key, value):
+    # query : (N, H, L, F_h)
+    # key   : (N, H, L, F_h)
+    # value : (N, H, L, F_h)
+    if hasattr(F, 'scaled_dot_product_attention'):
+        return F.scaled_dot_product_attention(query, key, value)
+
+    # NOTE: fallback for torch < 2.0 that lacks the fused kernel
+    scale = query.shape[-1] ** -0.5
+
+    # atten : (N, H, L, L)
+    atten = torch.matmul(query * scale, key.transpose(-2, -1))
+    atten = torch.softmax(atten, dim = -1)
+
+    return torch.matmul(atten, value)
+
+class MultiHeadSelfAttention(nn.Module):
+    """Batch-first multi-head self attention.
+
+    The parameters of this layer are named after the parameters of the
+    `nn.MultiheadAttention`, such that the state dicts of the two layers
+    are interchangeable. Unlike `nn.MultiheadAttention`, this layer never
+    materializes the attention weights and relies on the fused
+    scaled dot-product attention kernel instead.
+    """
+
+    def __init__(self, features, n_heads, **kwargs):
+        super().__init__(**kwargs)
+
+        if features % n_heads != 0:
+            raise ValueError(
+                "Number of heads %d does not divide number of features %d" % (
+                    n_heads, features
+                )
+            )
+
+        self.n_heads = n_heads
+
+        self.in_proj_weight = nn.Parameter(
+            torch.empty((3 * features, features))
+        )
+        self.in_proj_bias = nn.Parameter(torch.empty((3 * features, )))
+        self.out_proj       = nn.Linear(features, features)
+
+        self._reset_parameters()
+
+    def _reset_parameters(self):
+        # Follows initialization of the `nn.MultiheadAttention`
+        nn.init.xavier_uniform_(self.in_proj_weight)
+        nn.init.zeros_(self.in_proj_bias)
+        nn.init.zeros_(self.out_proj.bias)
+
+    def forward(self, x):
+        # x : (N, L, features)
+        N, L, features = x.shape
+
+        # qkv : (N, L, 3 * features)
+        qkv = F.linear(x, self.in_proj_weight, self.in_proj_bias)
+
+        # qkv : (N, L, 3 * features)
+        #    -> (N, L, 3, H, F_h)
+        #    -> (3, N, H, L, F_h)
+        qkv = qkv.view(N, L, 3, self.n_heads, -1).permute((2, 0, 3, 1, 4))
+
+        # y : (N, H, L, F_h)
+        y = scaled_dot_product_attention(qkv[0], qkv[1], qkv[2])
+
+        # y : (N, H, L, F_h)
+        #  -> (N, L, H, F_h)
+        #  -> (N, L, features)
+        y = y.transpose(1, 2).reshape(N, L, features)
+
+        return self.out_proj(y)
+
+def get_attention_layer(attention, features, n_heads):
+    # result : (layer, batch_first)
+    name, kwargs = extract_name_kwargs(attention)
+
+    if name == 'mha':
+        return (nn.MultiheadAttention(features, n_heads, **kwargs), False)
+
+    if name == 'sdpa':
+        return (MultiHeadSelfAttention(features, n_heads, **kwargs), True)
+
+    raise ValueError("Unknown attention: '%s'" % name)
+
 class TransformerBlock(nn.Module):
 
     def __init__(
         self, features, ffn_features, n_heads, activ = 'gelu', norm = None,
-        rezero = True, **kwargs
+        rezero = True, attention = 'mha', **kwargs
     ):
         super().__init__(**kwargs)
 
         self.norm1 = get_norm_layer(norm, features)
-        self.atten = nn.MultiheadAttention(features, n_heads)
+        self.atten, self.batch_first = get_attention_layer(
+            attention, features, n_heads
+        )
 
         self.norm2 = get_norm_layer(norm, features)
         self.ffn   = PositionWiseFFN(features, ffn_features, activ)
@@ -98,11 +190,15 @@ class TransformerBlock(nn.Module):
             self.re_alpha = 1
 
     def forward(self, x):
-        # x: (L, N, features)
+        # x: (L, N, features) or (N, L, features) if `self.batch_first`
 
         # Step 1: Multi-Head Self Attention
         y1 = self.norm1(x)
-        y1, _atten_weights = self.atten(y1, y1, y1)
+
+        if self.batch_first:
+            y1 = self.atten(y1)
+        else:
+            y1, _atten_weights = self.atten(y1, y1, y1, need_weights = False)
 
         y  = x + self.re_alpha * y1
 
@@ -121,22 +217,37 @@ class TransformerEncoder(nn.Module):
 
     def __init__(
         self, features, ffn_features, n_heads, n_blocks, activ, norm,
-        rezero = True, **kwargs
+        rezero = True, grad_checkpoint = False, attention = 'mha', **kwargs
     ):
         super().__init__(**kwargs)
 
         self.encoder = nn.Sequential(*[
             TransformerBlock(
-                features, ffn_features, n_heads, activ, norm, rezero
+                features, ffn_features, n_heads, activ, norm, rezero,
+                attention
             ) for _ in range(n_blocks)
         ])
 
+        self.grad_checkpoint = grad_checkpoint
+        self.batch_first     = all(b.batch_first for b in self.encoder)
+
     def forward(self, x):
         # x : (N, L, features)
 
-        # y : (L, N, features)
-        y = x.permute((1, 0, 2))
-        y = self.encoder(y)
+        if self.batch_first:
+            y = x
+        else:
+            # y : (L, N, features)
+            y = x.permute((1, 0, 2))
+
+        if self.grad_checkpoint:
+            for block in self.encoder:
+                y = call_with_checkpoint(block, y)
+        else:
+            y = self.encoder(y)
+
+        if self.batch_first:
+            return y
 
         # result : (N, L, features)
         result = y.permute((1, 0, 2))
@@ -206,7 +317,8 @@ class PixelwiseViT(nn.Module):
 
     def __init__(
         self, features, n_heads, n_blocks, ffn_features, embed_features,
-        activ, norm, image_shape, rezero = True, **kwargs
+        activ, norm, image_shape, rezero = True, grad_checkpoint = False,
+        attention = 'mha', **kwargs
     ):
         super().__init__(**kwargs)
 
@@ -218,7 +330,8 @@ class PixelwiseViT(nn.Module):
         )
 
         self.encoder = TransformerEncoder(
-            features, ffn_features, n_heads, n_blocks, activ, norm, rezero
+            features, ffn_features, n_heads, n_blocks, activ, norm, rezero,
+            grad_checkpoint, attention
         )
 
         self.trans_output = nn.Linear(features, image_shape[0])
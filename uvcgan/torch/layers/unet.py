@@ -4,6 +4,7 @@
 import torch
 from torch import nn
 
+from uvcgan.torch.funcs  import call_with_checkpoint
 from uvcgan.torch.select import get_norm_layer, get_activ_layer
 
 from .cnn import get_downsample_x2_layer, get_upsample_x2_layer
@@ -99,7 +100,7 @@ class UNetBlock(nn.Module):
 
     def __init__(
         self, features, activ, norm, image_shape, downsample, upsample,
-        rezero = True, **kwargs
+        rezero = True, grad_checkpoint = False, **kwargs
     ):
         super().__init__(**kwargs)
 
@@ -114,6 +115,8 @@ class UNetBlock(nn.Module):
             image_shape, activ, norm, upsample, self.inner_shape, rezero
         )
 
+        self.grad_checkpoint = grad_checkpoint
+
     def get_inner_shape(self):
         return self.inner_shape
 
@@ -126,6 +129,9 @@ class UNetBlock(nn.Module):
     def forward(self, x):
         # x : (N, C, H, W)
 
+        if self.grad_checkpoint:
+            return self._forward_checkpointed(x)
+
         # y : (N, C_inner, H_inner, W_inner)
         # r : (N, C_inner, H, W)
         (y, r) = self.conv(x)
@@ -138,11 +144,21 @@ class UNetBlock(nn.Module):
 
         return y
 
+    def _forward_checkpointed(self, x):
+        # NOTE:
+        #   The encoder and decoder are checkpointed separately. Wrapping
+        #   the entire block would also wrap the inner module and result in
+        #   nested recomputations of the inner blocks.
+        (y, r) = call_with_checkpoint(self.conv, x)
+        y      = self.inner_module(y)
+
+        return call_with_checkpoint(self.deconv, y, r)
+
 class UNet(nn.Module):
 
     def __init__(
         self, features_list, activ, norm, image_shape, downsample, upsample,
-        rezero = True, **kwargs
+        rezero = True, grad_checkpoint = False, **kwargs
     ):
         # pylint: disable = too-many-locals
         super().__init__(**kwargs)
@@ -159,7 +175,7 @@ class UNet(nn.Module):
         for features in features_list:
             layer = UNetBlock(
                 features, activ, norm, curr_image_shape, downsample, upsample,
-                rezero
+                rezero, grad_checkpoint
             )
             curr_image_shape = layer.get_inner_shape()
             unet_layers.append(layer)
@@ -0,0 +1,203 @@
+import logging
+
+import torch
+from torch import nn
+
+from .layers.transformer import (
+    TransformerEncoder, TransformerBlock, MultiHeadSelfAttention,
+    scaled_dot_product_attention
+)
+from .layers.unet        import UnetBasicBlock
+
+LOGGER = logging.getLogger('uvcgan.torch')
+
+try:
+    # torch >= 1.13
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+    def prepare_fx_module(module, backend, example_input):
+        return prepare_fx(
+            module, get_default_qconfig_mapping(backend), (example_input, )
+        )
+
+except ImportError:
+    from torch.quantization import get_default_qconfig
+    from torch.quantization.quantize_fx import prepare_fx, convert_fx
+
+    def prepare_fx_module(module, backend, _example_input):
+        return prepare_fx(module, { '' : get_default_qconfig(backend) })
+
+def select_quantized_engine():
+    engines = torch.backends.quantized.supported_engines
+
+    for engine in [ 'fbgemm', 'qnnpack' ]:
+        if engine in engines:
+            torch.backends.quantized.engine = engine
+            return engine
+
+    raise RuntimeError(
+        "No supported quantization engine found among: %s" % engines
+    )
+
+class QuantizableSelfAttention(nn.Module):
+    """Batch-first self attention with plain `Linear` projections.
+
+    Inference-only replacement of `nn.MultiheadAttention` and
+    `MultiHeadSelfAttention`. Their input projections are stored as bare
+    parameters, and the output projection of `nn.MultiheadAttention` is a
+    `NonDynamicallyQuantizableLinear`, so dynamic quantization skips them.
+    Here, all projections are `nn.Linear` layers that can be quantized.
+    """
+
+    def __init__(self, features, n_heads, **kwargs):
+        super().__init__(**kwargs)
+
+        self.n_heads  = n_heads
+        self.in_proj  = nn.Linear(features, 3 * features)
+        self.out_proj = nn.Linear(features, features)
+
+    @staticmethod
+    def from_attention(atten):
+        if isinstance(atten, nn.MultiheadAttention):
+            # pylint: disable=protected-access
+            if (
+                   (not atten._qkv_same_embed_dim)
+                or (atten.in_proj_bias is None)
+                or (atten.bias_k is not None)
+            ):
+                raise ValueError(
+                    'Unsupported configuration of nn.MultiheadAttention'
+                )
+
+            n_heads = atten.num_heads
+
+        elif isinstance(atten, MultiHeadSelfAttention):
+            n_heads = atten.n_heads
+
+        else:
+            raise ValueError(
+                "Unknown attention layer: '%s'" % type(atten).__name__
+            )
+
+        features = atten.in_proj_weight.shape[1]
+        result   = QuantizableSelfAttention(features, n_heads)
+
+        with torch.no_grad():
+            result.in_proj.weight.copy_(atten.in_proj_weight)
+            result.in_proj.bias.copy_(atten.in_proj_bias)
+            result.out_proj.weight.copy_(atten.out_proj.weight)
+            result.out_proj.bias.copy_(atten.out_proj.bias)
+
+        return result.to(atten.in_proj_weight.device).eval()
+
+    def forward(self, x):
+        # x : (N, L, features)
+        N, L, features = x.shape
+
+        # qkv : (N, L, 3 * features) -> (3, N, H, L, F_h)
+        qkv = self.in_proj(x)
+        qkv = qkv.view(N, L, 3, self.n_heads, -1).permute((2, 0, 3, 1, 4))
+
+        # y : (N, H, L, F_h) -> (N, L, features)
+        y = scaled_dot_product_attention(qkv[0], qkv[1], qkv[2])
+        y = y.transpose(1, 2).reshape(N, L, features)
+
+        return self.out_proj(y)
+
+def make_attention_quantizable(encoder):
+    """Replace attention layers of `encoder` by `QuantizableSelfAttention`."""
+    for block in encoder.encoder:
+        if isinstance(block, TransformerBlock):
+            block.atten       = QuantizableSelfAttention.from_attention(
+                block.atten
+            )
+            block.batch_first = True
+
+    encoder.batch_first = all(b.batch_first for b in encoder.encoder)
+
+def list_quantized_modules(model):
+    """Return names of the modules of `model` with quantized weights."""
+    # NOTE: quantized modules expose their weights via `weight()` method
+    return [
+        name for (name, m) in model.named_modules()
+            if '.quantized' in type(m).__module__
+            and callable(getattr(m, 'weight', None))
+    ]
+
+def quantize_transformers_dynamic(model):
+    """Apply int8 dynamic quantization to `Linear` layers of transformers.
+
+    Attention layers are first replaced by `QuantizableSelfAttention`, so
+    that the attention input and output projections are quantized along
+    with the feed-forward layers. Returns the number of quantized
+    transformer encoders.
+    """
+    encoders = [
+        m for m in model.modules() if isinstance(m, TransformerEncoder)
+    ]
+
+    for encoder in encoders:
+        make_attention_quantizable(encoder)
+        torch.quantization.quantize_dynamic(
+            encoder, { nn.Linear }, dtype = torch.qint8, inplace = True
+        )
+
+    return len(encoders)
+
+def capture_inputs(modules, fn):
+    """Capture first inputs of `modules` while running `fn()`."""
+    result  = {}
+    handles = []
+
+    def hook(module, inputs):
+        if module not in result:
+            result[module] = inputs[0].detach()
+
+    for module in modules:
+        handles.append(module.register_forward_pre_hook(hook))
+
+    try:
+        fn()
+    finally:
+        for handle in handles:
+            handle.remove()
+
+    return result
+
+class StaticConvQuantizer:
+    """Post-training static int8 quantization of the UNet conv blocks.
+
+    The conv blocks are prepared for quantization with FX graph mode on
+    the inputs captured during `prepare(fn)`. Subsequent model evaluations
+    calibrate the quantization observers, and `convert` replaces the
+    blocks by their quantized versions. The quantized blocks take and
+    return float tensors, so the rest of the model is unaffected.
+    """
+
+    def __init__(self, models, backend):
+        self._blocks  = [
+            m for model in models for m in model.modules()
+                if isinstance(m, UnetBasicBlock)
+        ]
+        self._backend = backend
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def prepare(self, fn):
+        examples = capture_inputs([ m.block for m in self._blocks ], fn)
+
+        for m in self._blocks:
+            if m.block not in examples:
+                LOGGER.warning('UNet block is not used. Skipping.')
+                continue
+
+            m.block = prepare_fx_module(
+                m.block, self._backend, examples[m.block]
+            )
+
+    def convert(self):
+        for m in self._blocks:
+            if isinstance(m.block, torch.fx.GraphModule):
+                m.block = convert_fx(m.block)
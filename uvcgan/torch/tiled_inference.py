@@ -0,0 +1,149 @@
+import math
+
+import torch
+from torch import nn
+from torch.nn import functional as F
+
+WINDOW_UNIFORM  = 'uniform'
+WINDOW_TRIANGLE = 'triangle'
+WINDOW_HANN     = 'hann'
+
+WINDOWS = [ WINDOW_UNIFORM, WINDOW_TRIANGLE, WINDOW_HANN ]
+
+def get_window_1d(size, window, device):
+    # NOTE: windows are evaluated without their zero end points, such that
+    #       pixels at the image borders get nonzero weights.
+    if window == WINDOW_UNIFORM:
+        return torch.ones(size, device = device)
+
+    x = torch.arange(1, size + 1, device = device) / (size + 1)
+
+    if window == WINDOW_TRIANGLE:
+        return 1 - torch.abs(2 * x - 1)
+
+    if window == WINDOW_HANN:
+        return torch.sin(math.pi * x) ** 2
+
+    raise ValueError("Unknown blending window: '%s'" % window)
+
+def get_window_2d(tile_size, window, device):
+    # result : (H, W)
+    win_h = get_window_1d(tile_size[0], window, device)
+    win_w = get_window_1d(tile_size[1], window, device)
+
+    return win_h[:, None] * win_w[None, :]
+
+def calc_padded_size(size, tile, stride):
+    if size <= tile:
+        return tile
+
+    return tile + math.ceil((size - tile) / stride) * stride
+
+def pad_image(x, padded_size):
+    # x : (N, C, H, W)
+    pad_h = padded_size[0] - x.shape[2]
+    pad_w = padded_size[1] - x.shape[3]
+
+    if (pad_h == 0) and (pad_w == 0):
+        return x
+
+    if (pad_h < x.shape[2]) and (pad_w < x.shape[3]):
+        mode = 'reflect'
+    else:
+        mode = 'replicate'
+
+    return F.pad(x, (0, pad_w, 0, pad_h), mode = mode)
+
+def apply_batched(model, tiles, batch_size):
+    return torch.cat(
+        [ model(x) for x in torch.split(tiles, batch_size, dim = 0) ],
+        dim = 0
+    )
+
+def tiled_apply(
+    model, x, tile_size, overlap, window = WINDOW_HANN, batch_size = 16
+):
+    """Apply image-to-image `model` to `x` with a sliding window.
+
+    The image `x` is split into overlapping tiles of size `tile_size`,
+    tiles of all the images are passed through `model` in batches of
+    `batch_size`, and the outputs are blended back with the `window`
+    weights.
+    """
+    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-locals
+
+    # x : (N, C, H, W)
+    N, _C, H, W = x.shape
+    tile_h, tile_w = tile_size
+
+    stride = (tile_h - overlap, tile_w - overlap)
+
+    if min(stride) <= 0:
+        raise ValueError(
+            "Tile overlap %d must be smaller than tile size %s"
+            % (overlap, tile_size)
+        )
+
+    padded_size = (
+        calc_padded_size(H, tile_h, stride[0]),
+        calc_padded_size(W, tile_w, stride[1]),
+    )
+
+    x = pad_image(x, padded_size)
+
+    # tiles : (N, C * tile_h * tile_w, L)
+    tiles = F.unfold(x, kernel_size = tile_size, stride = stride)
+    L     = tiles.shape[2]
+
+    # tiles : (N * L, C, tile_h, tile_w)
+    tiles = tiles.permute(0, 2, 1).reshape(N * L, -1, tile_h, tile_w)
+
+    # result : (N * L, C_out, tile_h, tile_w)
+    result = apply_batched(model, tiles, batch_size)
+
+    assert result.shape[2:] == tiles.shape[2:], \
+        "Tiled inference requires models that preserve image size"
+
+    C_out = result.shape[1]
+    win   = get_window_2d(tile_size, window, result.device).to(result.dtype)
+
+    # result : (N, C_out * tile_h * tile_w, L)
+    result = (result * win).reshape(N, L, -1).permute(0, 2, 1)
+    result = F.fold(
+        result, padded_size, kernel_size = tile_size, stride = stride
+    )
+
+    # weights : (1, tile_h * tile_w, L)
+    weights = win.reshape(1, -1, 1).expand(1, -1, L)
+    weights = F.fold(
+        weights, padded_size, kernel_size = tile_size, stride = stride
+    )
+
+    result = result / weights
+    result = result[:, :, :H, :W]
+
+    assert result.shape[1] == C_out
+    return result
+
+class TiledInference(nn.Module):
+    """Wrapper that evaluates the wrapped generator tile by tile."""
+
+    def __init__(
+        self, model, tile_size, overlap = 32, window = WINDOW_HANN,
+        batch_size = 16, **kwargs
+    ):
+        # pylint: disable=too-many-arguments
+        super().__init__(**kwargs)
+
+        self.model      = model
+        self.tile_size  = tuple(tile_size)
+        self.overlap    = overlap
+        self.window     = window
+        self.batch_size = batch_size
+
+    def forward(self, x):
+        return tiled_apply(
+            self.model, x, self.tile_size, self.overlap, self.window,
+            self.batch_size
+        )
@@ -1 +1,3 @@
-from .history import TrainingHistory
+from .history     import TrainingHistory
+from .metrics_log import MetricsLog, read_metrics_log
+from .retention   import CheckpointRetention, construct_checkpoint_retention
@@ -1,39 +1,110 @@
 import os
 import pandas as pd
 
-HISTORY_NAME = 'history.csv'
+from .metrics_log import MetricsLog, read_metrics_log
+
+HISTORY_NAME     = 'history.csv'
+METRICS_LOG_NAME = 'metrics.jsonl'
+
+KIND_EPOCH = 'epoch'
+KIND_STEP  = 'step'
 
 class TrainingHistory:
+    """Training history.
+
+    Epoch and step metrics are appended to `metrics.jsonl` as they arrive.
+    The epoch metrics are also exported to `history.csv` by `save`, for
+    compatibility with the existing tooling. `save` rewrites the whole
+    file, so it is called only on `close`, at the end of training.
+    """
 
     def __init__(self, savedir):
-        self._history = None
+        self._records = []
         self._savedir = savedir
+        self._log     = None
+
+    def _get_log(self):
+        if self._log is None:
+            self._log = MetricsLog(
+                os.path.join(self._savedir, METRICS_LOG_NAME)
+            )
+
+        return self._log
+
+    def log_step(self, epoch, step, values):
+        record = { k : v for (k, v) in values.items() if k != 'step' }
+        record.update({ 'kind' : KIND_STEP, 'epoch' : epoch, 'step' : step })
+
+        self._get_log().write(record)
 
-    def end_epoch(self, epoch, metrics):
+    def end_epoch(self, epoch, metrics, perf = None):
         values = metrics.values
-        values['epoch'] = epoch
-        values['time']  = pd.Timestamp.utcnow()
 
-        if self._history is None:
-            self._history = pd.DataFrame([ values, ])
-        else:
-            self._history = pd.concat([self._history, pd.DataFrame([values])], ignore_index=True)
+        if perf is not None:
+            values.update(perf.values)
 
-        self.save()
+            for record in perf.step_records:
+                self.log_step(epoch, record['step'], record)
+
+        values['epoch'] = epoch
+        values['time']  = pd.Timestamp.utcnow().isoformat()
+
+        self._records.append(values)
+        self._get_log().write({ 'kind' : KIND_EPOCH, **values })
 
     def save(self):
-        self._history.to_csv(
+        if not self._records:
+            return
+
+        self.history.to_csv(
             os.path.join(self._savedir, HISTORY_NAME), index = False
         )
 
-    def load(self):
-        path = os.path.join(self._savedir, HISTORY_NAME)
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+        self.save()
+
+    def _load_csv(self, path):
+        # NOTE: migrate history of older runs into the metrics log
+        records = pd.read_csv(path).to_dict('records')
+
+        for record in records:
+            self._get_log().write({ 'kind' : KIND_EPOCH, **record })
+
+        return records
+
+    def load(self, epoch = None):
+        """Load history, dropping records after `epoch`, if specified."""
+        path_log = os.path.join(self._savedir, METRICS_LOG_NAME)
+        path_csv = os.path.join(self._savedir, HISTORY_NAME)
+
+        if os.path.exists(path_log):
+            records = read_metrics_log(path_log, KIND_EPOCH)
+        elif os.path.exists(path_csv):
+            records = self._load_csv(path_csv)
+        else:
+            return
+
+        # NOTE: epochs repeated after a restart -- the last record wins
+        records = { int(r['epoch']) : r for r in records }
+
+        if epoch is not None:
+            records = { k : v for (k, v) in records.items() if k <= epoch }
+
+        self._records = [ records[k] for k in sorted(records) ]
 
-        if os.path.exists(path):
-            self._history = pd.read_csv(path, parse_dates = [ 'time', ])
+        for record in self._records:
+            record.pop('kind', None)
 
     @property
     def history(self):
-        return self._history
+        if not self._records:
+            return None
 
+        result = pd.DataFrame(self._records)
+        result['time'] = pd.to_datetime(result['time'])
 
+        return result
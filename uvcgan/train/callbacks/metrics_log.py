@@ -0,0 +1,84 @@
+import atexit
+import json
+import logging
+import queue
+import threading
+
+LOGGER = logging.getLogger('uvcgan.train')
+
+class MetricsLog:
+    """Append-only log of metric records.
+
+    Each record is a dictionary, stored as a single JSON line. Records are
+    serialized and appended to the file by a background thread, such that
+    `write` never blocks on the disk I/O. The file is flushed whenever the
+    queue of pending records becomes empty, and the pending records are
+    written out at the interpreter exit if the log is not closed.
+
+    An error in the background thread is logged when it happens, and is
+    re-raised by `close`.
+    """
+
+    def __init__(self, path):
+        self._path   = path
+        self._queue  = queue.Queue()
+        self._error  = None
+        self._thread = threading.Thread(target = self._run, daemon = True)
+        self._thread.start()
+
+        atexit.register(self._stop)
+
+    def _write_records(self, f):
+        while True:
+            record = self._queue.get()
+
+            if record is None:
+                break
+
+            f.write(json.dumps(record) + '\n')
+
+            if self._queue.empty():
+                f.flush()
+
+    def _run(self):
+        # NOTE: the file is flushed when closed, also on errors
+        try:
+            with open(self._path, 'at', encoding = 'utf-8') as f:
+                self._write_records(f)
+        except Exception as e:  # pylint: disable=broad-except
+            LOGGER.exception("Failed to write metrics log '%s'", self._path)
+            self._error = e
+
+    def _stop(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def write(self, record):
+        self._queue.put(record)
+
+    def close(self):
+        self._stop()
+        atexit.unregister(self._stop)
+
+        if self._error is not None:
+            error       = self._error
+            self._error = None
+            raise error
+
+def read_metrics_log(path, kind = None):
+    """Read records of metrics log, optionally selecting a `kind`."""
+    result = []
+
+    with open(path, 'rt', encoding = 'utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # NOTE: last line may be incomplete if training was killed
+                continue
+
+            if (kind is None) or (record.get('kind') == kind):
+                result.append(record)
+
+    return result
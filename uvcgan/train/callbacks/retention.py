@@ -0,0 +1,129 @@
+import json
+import logging
+import os
+
+from uvcgan.cgan.checkpoint import (
+    CHECKPOINTS_DIR, list_checkpoint_epochs, remove_checkpoint
+)
+
+SCORES_NAME = 'retention.json'
+LOGGER      = logging.getLogger('uvcgan.train')
+
+class CheckpointRetention:
+    """Prune old epoch checkpoints.
+
+    A checkpoint is kept if it satisfies any of the rules:
+      - `keep_last`  : it is one of the `keep_last` most recent checkpoints.
+      - `keep_every` : its epoch is divisible by `keep_every`.
+      - `keep_best`  : it is one of the `keep_best` checkpoints with the best
+                       value of the training `metric`.
+
+    If no rule is specified, all checkpoints are kept. The most recent
+    checkpoint is never removed. Metric values of the
+    saved checkpoints are stored in `checkpoints/retention.json`, such that
+    the policy survives training restarts.
+    """
+
+    def __init__(
+        self, savedir,
+        keep_last  = None,
+        keep_every = None,
+        keep_best  = None,
+        metric     = None,
+        mode       = 'min',
+    ):
+        # pylint: disable=too-many-arguments
+        if mode not in [ 'min', 'max' ]:
+            raise ValueError("Unknown retention mode: '%s'" % mode)
+
+        if (keep_best is not None) and (metric is None):
+            raise ValueError("Retention `keep_best` requires a `metric`")
+
+        self._savedir    = savedir
+        self._keep_last  = keep_last
+        self._keep_every = keep_every
+        self._keep_best  = keep_best
+        self._metric     = metric
+        self._mode       = mode
+        self._scores     = {}
+
+        self.load()
+
+    def _get_scores_path(self):
+        return os.path.join(self._savedir, CHECKPOINTS_DIR, SCORES_NAME)
+
+    def load(self):
+        path = self._get_scores_path()
+
+        if os.path.exists(path):
+            with open(path, 'rt', encoding = 'utf-8') as f:
+                self._scores = {
+                    int(epoch) : score
+                        for (epoch, score) in json.load(f).items()
+                }
+
+    def save(self):
+        path = self._get_scores_path()
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+
+        with open(path, 'wt', encoding = 'utf-8') as f:
+            json.dump(self._scores, f, indent = 4)
+
+    def _select_best(self, epochs):
+        scored = [ epoch for epoch in epochs if epoch in self._scores ]
+        scored = sorted(
+            scored, key = lambda epoch : self._scores[epoch],
+            reverse = (self._mode == 'max')
+        )
+
+        return set(scored[:self._keep_best])
+
+    def select_kept(self, epochs):
+        if all(x is None for x in (
+            self._keep_last, self._keep_every, self._keep_best
+        )):
+            return set(epochs)
+
+        result = set()
+
+        if self._keep_last is not None:
+            result.update(sorted(epochs)[-self._keep_last:])
+
+        if self._keep_every is not None:
+            result.update(e for e in epochs if e % self._keep_every == 0)
+
+        if self._keep_best is not None:
+            result.update(self._select_best(epochs))
+
+        return result
+
+    def end_checkpoint(self, epoch, metrics):
+        if self._metric is not None:
+            if self._metric not in metrics:
+                raise ValueError(
+                    "Unknown retention metric: '%s'" % self._metric
+                )
+
+            self._scores[epoch] = float(metrics[self._metric])
+
+        # NOTE: the most recent checkpoint is always kept, to be able to
+        #       resume training. It may also still be written in the
+        #       background.
+        epochs = set(list_checkpoint_epochs(self._savedir))
+        epochs.add(epoch)
+
+        kept = self.select_kept(sorted(epochs))
+        kept.add(epoch)
+
+        for e in sorted(epochs - kept):
+            LOGGER.debug('Removing checkpoint at epoch %d', e)
+            remove_checkpoint(self._savedir, e)
+            self._scores.pop(e, None)
+
+        self.save()
+
+def construct_checkpoint_retention(savedir, retention):
+    if retention is None:
+        return None
+
+    return CheckpointRetention(savedir, **retention)
@@ -1,2 +1,2 @@
 from .loss_metrics import LossMetrics
-
+from .perf_metrics import PerfMetrics, get_batch_size, get_max_rss_mb
@@ -1,6 +1,20 @@
 import copy
+import torch
+
+def detach_value(value):
+    if torch.is_tensor(value):
+        return value.detach().clone()
+
+    return copy.deepcopy(value)
 
 class LossMetrics:
+    """Running average of the training losses.
+
+    The loss values can be either python numbers or tensors. Tensors are
+    accumulated on their devices, such that `update` never forces a device
+    synchronization. The accumulated values are read back to the host only
+    when `values` is accessed.
+    """
 
     def __init__(self):
         self._values = None
@@ -11,14 +25,25 @@ class LossMetrics:
         if self._values is None:
             return None
 
-        return { k : v / self._n for (k,v) in self._values.items() }
+        keys   = list(self._values.keys())
+        values = [ self._values[k] for k in keys ]
+
+        if all(torch.is_tensor(v) for v in values):
+            # Single device -> host transfer for all the losses
+            values = torch.stack(
+                [ v.float().reshape(()) for v in values ]
+            ).tolist()
+
+        return { k : float(v) / self._n for (k,v) in zip(keys, values) }
 
     def update(self, values):
         if self._values is None:
-            self._values = copy.deepcopy(values)
+            self._values = { k : detach_value(v) for (k,v) in values.items() }
         else:
             for k,v in values.items():
+                if torch.is_tensor(v):
+                    v = v.detach()
+
                 self._values[k] += v
 
         self._n += 1
-
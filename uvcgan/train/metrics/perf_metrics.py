@@ -0,0 +1,140 @@
+import contextlib
+import time
+
+import torch
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def get_batch_size(batch):
+    if torch.is_tensor(batch):
+        return batch.shape[0]
+
+    if isinstance(batch, (list, tuple)):
+        return get_batch_size(batch[0])
+
+    if isinstance(batch, dict):
+        return get_batch_size(next(iter(batch.values())))
+
+    raise ValueError("Cannot determine batch size of '%s'" % type(batch))
+
+def get_max_rss_mb(children = False):
+    """Peak resident memory of the process (or its terminated children)."""
+    if resource is None:
+        return None
+
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+
+    # NOTE: ru_maxrss is in KiB on linux
+    return resource.getrusage(who).ru_maxrss / 1024
+
+class PerfMetrics:
+    """Per-epoch training performance metrics.
+
+    Code sections of the training step are timed with `section`. On CUDA
+    devices the sections are timed with CUDA events, which are resolved
+    lazily by `flush`, such that the timing itself does not force a device
+    synchronization on every step. Host-side intervals (e.g. waiting for
+    the data loader) are recorded with `add`.
+
+    Per-epoch values:
+      - `time_NAME`      : average time of section NAME per step [s].
+      - `images_per_sec` : training throughput.
+      - `max_mem_mb`     : peak allocated device memory [MiB] (CUDA only).
+      - `max_rss_mb`     : peak resident memory of the process [MiB].
+    """
+
+    def __init__(self, device, record_steps = False):
+        self._cuda         = (torch.device(device).type == 'cuda')
+        self._device       = device
+        self._record_steps = record_steps
+
+        self._totals   = {}
+        self._pending  = []
+        self._records  = {}
+        self._n_images = 0
+        self._time     = 0
+        self._start    = None
+
+        self.step = 0
+
+    def start_epoch(self):
+        if self._cuda:
+            torch.cuda.reset_peak_memory_stats(self._device)
+
+        self._start = time.perf_counter()
+
+    def add(self, name, seconds, step = None):
+        if step is None:
+            step = self.step
+
+        self._totals[name] = self._totals.get(name, 0) + seconds
+
+        if self._record_steps:
+            record = self._records.setdefault(step, { 'step' : step })
+            record['time_' + name] = record.get('time_' + name, 0) + seconds
+
+    @contextlib.contextmanager
+    def section(self, name):
+        if not self._cuda:
+            start = time.perf_counter()
+            yield
+            self.add(name, time.perf_counter() - start)
+            return
+
+        start = torch.cuda.Event(enable_timing = True)
+        end   = torch.cuda.Event(enable_timing = True)
+
+        start.record()
+        yield
+        end.record()
+
+        self._pending.append((self.step, name, start, end))
+
+    def end_step(self, n_images):
+        self._n_images += n_images
+        self.step      += 1
+
+    def flush(self):
+        for (step, name, start, end) in self._pending:
+            end.synchronize()
+            self.add(name, start.elapsed_time(end) / 1000, step)
+
+        self._pending = []
+
+    def end_epoch(self):
+        self.flush()
+
+        if self._cuda:
+            torch.cuda.synchronize(self._device)
+
+        self._time = time.perf_counter() - self._start
+
+    @property
+    def values(self):
+        steps  = max(self.step, 1)
+        result = {
+            'time_' + name : total / steps
+                for (name, total) in self._totals.items()
+        }
+
+        if self._time > 0:
+            result['images_per_sec'] = self._n_images / self._time
+
+        if self._cuda:
+            result['max_mem_mb'] = (
+                torch.cuda.max_memory_allocated(self._device) / 1024**2
+            )
+
+        max_rss = get_max_rss_mb()
+        if max_rss is not None:
+            result['max_rss_mb'] = max_rss
+
+        return result
+
+    @property
+    def step_records(self):
+        """Flushed per-step timings, if `record_steps` is enabled."""
+        return [ self._records[step] for step in sorted(self._records) ]
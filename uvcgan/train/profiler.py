@@ -0,0 +1,104 @@
+import logging
+import os
+
+import torch
+
+PROFILES_DIR = 'profiles'
+LOGGER       = logging.getLogger('uvcgan.train')
+
+class TrainingProfiler:
+    """Capture an operator-level profile of a window of training steps.
+
+    At the training epoch `epoch`, the profiler skips the first `wait`
+    steps, runs `warmup` steps without recording and records the next
+    `active` steps. The trace is saved into `savedir/profiles` (viewable
+    with TensorBoard or `chrome://tracing`), and a table of the top
+    `row_limit` operators, sorted by `sort_by`, is printed and saved next
+    to it.
+    """
+
+    def __init__(
+        self, savedir,
+        epoch          = 1,
+        wait           = 5,
+        warmup         = 2,
+        active         = 5,
+        record_shapes  = True,
+        profile_memory = True,
+        with_stack     = True,
+        sort_by        = None,
+        row_limit      = 25,
+    ):
+        # pylint: disable=too-many-arguments
+        self._savedir    = os.path.join(savedir, PROFILES_DIR)
+        self._epoch      = epoch
+        self._schedule   = torch.profiler.schedule(
+            wait = wait, warmup = warmup, active = active, repeat = 1
+        )
+        self._kwargs     = {
+            'record_shapes'  : record_shapes,
+            'profile_memory' : profile_memory,
+            'with_stack'     : with_stack,
+        }
+        self._with_stack = with_stack
+        self._row_limit  = row_limit
+
+        if sort_by is None:
+            if torch.cuda.is_available():
+                sort_by = 'self_cuda_time_total'
+            else:
+                sort_by = 'self_cpu_time_total'
+
+        self._sort_by = sort_by
+
+    def is_active(self, epoch):
+        return (epoch == self._epoch)
+
+    def _on_trace_ready(self, prof):
+        os.makedirs(self._savedir, exist_ok = True)
+
+        torch.profiler.tensorboard_trace_handler(self._savedir)(prof)
+
+        table = prof.key_averages().table(
+            sort_by = self._sort_by, row_limit = self._row_limit
+        )
+
+        path = os.path.join(self._savedir, 'epoch_%04d_ops.txt' % self._epoch)
+        with open(path, 'wt', encoding = 'utf-8') as f:
+            f.write(table)
+
+        if self._with_stack:
+            table_stack = prof.key_averages(group_by_stack_n = 5).table(
+                sort_by = self._sort_by, row_limit = self._row_limit
+            )
+
+            path = os.path.join(
+                self._savedir, 'epoch_%04d_ops_stack.txt' % self._epoch
+            )
+            with open(path, 'wt', encoding = 'utf-8') as f:
+                f.write(table_stack)
+
+        print(table)
+        LOGGER.info("Profiler traces saved to '%s'", self._savedir)
+
+    def profile(self):
+        activities = [ torch.profiler.ProfilerActivity.CPU ]
+
+        if torch.cuda.is_available():
+            activities.append(torch.profiler.ProfilerActivity.CUDA)
+
+        return torch.profiler.profile(
+            activities     = activities,
+            schedule       = self._schedule,
+            on_trace_ready = self._on_trace_ready,
+            **self._kwargs
+        )
+
+def construct_training_profiler(savedir, profile):
+    if profile is None:
+        return None
+
+    if isinstance(profile, int):
+        profile = { 'epoch' : profile }
+
+    return TrainingProfiler(savedir, **profile)
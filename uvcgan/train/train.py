@@ -1,37 +1,83 @@
+import contextlib
+import functools
 from itertools import islice
+import time
 import tqdm
 
-from uvcgan.config      import Args
-from uvcgan.data        import construct_data_loaders
-from uvcgan.torch.funcs import get_torch_device_smart, seed_everything
-from uvcgan.cgan        import construct_model
-from uvcgan.utils.log   import setup_logging
+from uvcgan.config          import Args
+from uvcgan.data            import construct_data_loaders
+from uvcgan.torch.funcs     import get_torch_device_smart, seed_everything
+from uvcgan.cgan            import construct_model
+from uvcgan.cgan.checkpoint import AsyncCheckpointWriter
+from uvcgan.utils.log       import setup_logging
 
-from .metrics   import LossMetrics
-from .callbacks import TrainingHistory
+from .metrics   import LossMetrics, PerfMetrics, get_batch_size
+from .callbacks import TrainingHistory, construct_checkpoint_retention
 from .transfer  import transfer
-
-def training_epoch(it_train, model, title, steps_per_epoch):
+from .profiler  import construct_training_profiler
+
+def training_epoch(
+    it_train, model, title, steps_per_epoch, metrics_interval = 50,
+    step_log = False, profiler = None, on_metrics = None
+):
+    # pylint: disable=too-many-arguments
+    # NOTE:
+    #   Losses are accumulated on the device and are read back to the host
+    #   only every `metrics_interval` steps, to avoid draining the device
+    #   queue on every step. If `metrics_interval` is None or not positive,
+    #   the losses are read back only at the end of the epoch.
     model.train()
 
+    if (metrics_interval is not None) and (metrics_interval <= 0):
+        metrics_interval = None
+
     steps = len(it_train)
     if steps_per_epoch is not None:
         steps = min(steps, steps_per_epoch)
 
     progbar = tqdm.tqdm(desc = title, total = steps, dynamic_ncols = True)
     metrics = LossMetrics()
+    perf    = PerfMetrics(model.device, record_steps = step_log)
+
+    model.timer = perf
+    perf.start_epoch()
+
+    data_start = time.perf_counter()
+
+    with (profiler or contextlib.nullcontext()):
+        for (step, batch) in enumerate(islice(it_train, steps)):
+            perf.add('data', time.perf_counter() - data_start)
+
+            model.set_input(batch)
+            model.optimization_step()
+
+            metrics.update(model.get_current_losses(sync = False))
+            perf.end_step(get_batch_size(batch))
+
+            if profiler is not None:
+                profiler.step()
 
-    for batch in islice(it_train, steps):
-        model.set_input(batch)
-        model.optimization_step()
+            if (
+                    (metrics_interval is not None)
+                and ((step + 1) % metrics_interval == 0)
+            ):
+                values = metrics.values
+                progbar.set_postfix(values, refresh = False)
+                perf.flush()
 
-        metrics.update(model.get_current_losses())
+                if on_metrics is not None:
+                    on_metrics(step, values)
 
-        progbar.set_postfix(metrics.values, refresh = False)
-        progbar.update()
+            progbar.update()
+            data_start = time.perf_counter()
 
+    perf.end_epoch()
+    model.timer = None
+
+    progbar.set_postfix(metrics.values, refresh = False)
     progbar.close()
-    return metrics
+
+    return (metrics, perf)
 
 def try_continue_training(args, model):
     history = TrainingHistory(args.savedir)
@@ -40,7 +86,7 @@ def try_continue_training(args, model):
     model.load(start_epoch)
 
     if start_epoch > 0:
-        history.load()
+        history.load(start_epoch)
 
     start_epoch = max(start_epoch, 0)
 
@@ -68,17 +114,40 @@ def train(args_dict):
     if (start_epoch == 0) and (args.transfer is not None):
         transfer(model, args.transfer)
 
+    # NOTE:
+    #   With `async_checkpoint`, each checkpoint is a single consolidated
+    #   file, that is written in the background while training continues.
+    writer    = AsyncCheckpointWriter() if args.async_checkpoint else None
+    retention = construct_checkpoint_retention(
+        args.savedir, args.checkpoint_retention
+    )
+    profiler  = construct_training_profiler(args.savedir, args.profile)
+
     for epoch in range(start_epoch + 1, args.epochs + 1):
-        title   = 'Epoch %d / %d' % (epoch, args.epochs)
-        metrics = training_epoch(
-            it_train, model, title, args.config.steps_per_epoch
+        title = 'Epoch %d / %d' % (epoch, args.epochs)
+
+        epoch_profiler = None
+        if (profiler is not None) and profiler.is_active(epoch):
+            epoch_profiler = profiler.profile()
+
+        metrics, perf = training_epoch(
+            it_train, model, title, args.config.steps_per_epoch,
+            args.metrics_interval, args.step_log, epoch_profiler,
+            on_metrics = functools.partial(history.log_step, epoch)
         )
 
-        history.end_epoch(epoch, metrics)
+        history.end_epoch(epoch, metrics, perf)
         model.end_epoch(epoch)
 
         if epoch % args.checkpoint == 0:
-            model.save(epoch)
+            model.save(epoch, writer = writer)
+
+            if retention is not None:
+                retention.end_checkpoint(epoch, metrics.values)
+
+    model.save(epoch = None, writer = writer)
+    history.close()
 
-    model.save(epoch = None)
+    if writer is not None:
+        writer.close()
 
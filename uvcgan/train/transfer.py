@@ -8,8 +8,10 @@ from uvcgan.cgan   import construct_model
 LOGGER = logging.getLogger('uvcgan.train')
 
 def load_base_model(model, transfer_config):
+    models = list(transfer_config.transfer_map.values())
+
     try:
-        model.load(epoch = None)
+        model.load(epoch = None, models = models, mmap = True)
         return
 
     except IOError as e:
@@ -33,14 +35,15 @@ def load_base_model(model, transfer_config):
     else:
         raise RuntimeError("Failed to find transfer model checkpoints.")
 
-    model.load(epoch)
+    model.load(epoch, models = models, mmap = True)
 
 def get_base_model(transfer_config, device):
     base_path = os.path.join(ROOT_OUTDIR, transfer_config.base_model)
     base_args = Args.load(base_path)
 
     model = construct_model(
-        base_args.savedir, base_args.config, is_train = True, device = device
+        base_args.savedir, base_args.config, is_train = True, device = device,
+        skip_init = True
     )
 
     load_base_model(model, transfer_config)
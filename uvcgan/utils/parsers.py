@@ -100,6 +100,47 @@ def add_preset_name_parser(
         type    = str,
     )
 
+def add_outputs_parser(parser):
+    parser.add_argument(
+        '--outputs',
+        default = None,
+        dest    = 'outputs',
+        help    = (
+            'names of the images to compute and save (e.g. fake_b).'
+            ' Only the networks required by these images are loaded and'
+            ' evaluated (default = all images)'
+        ),
+        nargs   = '+',
+        type    = str,
+    )
+
+def add_profile_parser(parser):
+    parser.add_argument(
+        '--profile',
+        default = None,
+        dest    = 'profile',
+        help    = (
+            'capture an operator-level profile of the training steps at the'
+            ' given epoch. Traces are saved into `savedir/profiles`'
+        ),
+        metavar = 'EPOCH',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--profile-steps',
+        default = 5,
+        dest    = 'profile_steps',
+        help    = 'number of training steps to profile (default = 5)',
+        type    = int,
+    )
+
+def get_profile_config(cmdargs):
+    if cmdargs.profile is None:
+        return None
+
+    return { 'epoch' : cmdargs.profile, 'active' : cmdargs.profile_steps }
+
 def add_standard_eval_parsers(
     parser,
     default_batch_size = 1,